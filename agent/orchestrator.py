@@ -114,9 +114,9 @@ class AgentOrchestrator:
     
     def is_codebase_analyzed(self) -> bool:
         """Check if the codebase has been analyzed."""
-        # This would check if vector store exists and has content
-        # For now, return False to always trigger analysis
+        # A persisted index means the knowledge base can be loaded from disk
+        # instead of re-scanning and re-embedding the project
         from knowledge_base.vector_store import VectorStore
         
         store = VectorStore()
-        return store.is_initialized()
+        return store.has_persisted_index()
@@ -3,6 +3,7 @@
 from typing import Optional
 from pathlib import Path
 import os
+import pathspec
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -20,12 +21,26 @@ class Settings:
     # Vector Store Configuration
     VECTOR_STORE_TYPE: str = os.getenv("VECTOR_STORE_TYPE", "faiss")  # "faiss" or "chroma"
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
     VECTOR_DB_PATH: Path = Path(os.getenv("VECTOR_DB_PATH", "./vector_db"))
+    FAISS_INDEX_TYPE: str = os.getenv("FAISS_INDEX_TYPE", "hnsw")  # "flat", "sq8", "hnsw", "hnsw_sq8" or "ivfpq"
+    FAISS_IVF_NPROBE: int = int(os.getenv("FAISS_IVF_NPROBE", "16"))
+    FAISS_HNSW_M: int = int(os.getenv("FAISS_HNSW_M", "32"))
+    FAISS_HNSW_EF_CONSTRUCTION: int = int(os.getenv("FAISS_HNSW_EF_CONSTRUCTION", "200"))
+    FAISS_HNSW_EF_SEARCH: int = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+    RETRIEVAL_REDIS_URL: str = os.getenv("RETRIEVAL_REDIS_URL", "")  # Empty disables the shared cache
+    RETRIEVAL_CACHE_TTL: int = int(os.getenv("RETRIEVAL_CACHE_TTL", "300"))  # Seconds
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "1000"))
     CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "200"))
     
     # Code Analysis Configuration
     MAX_FILE_SIZE_MB: float = float(os.getenv("MAX_FILE_SIZE_MB", "10.0"))
+    AST_CACHE_ENABLED: bool = os.getenv("AST_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Per-user cache directory, so scans never write into the scanned checkout
+    AST_CACHE_PATH: Path = Path(os.getenv(
+        "AST_CACHE_PATH",
+        Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "pearl-thoughts" / "ast_cache",
+    ))
     EXCLUDE_PATTERNS: list = [
         "**/__pycache__/**",
         "**/.git/**",
@@ -41,6 +56,8 @@ class Settings:
         "**/*.pyo",
         "**/.DS_Store",
     ]
+    # Compiled once; matches paths relative to the scan root with gitignore semantics
+    EXCLUDE_SPEC: pathspec.PathSpec = pathspec.PathSpec.from_lines("gitwildmatch", EXCLUDE_PATTERNS)
     
     # Agent Configuration
     MAX_ITERATIONS: int = int(os.getenv("MAX_ITERATIONS", "20"))
@@ -1,31 +1,97 @@
 """Vector store management for RAG."""
 
 import os
-from typing import List, Dict, Any, Optional
+import json
+import hashlib
+import functools
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+from langchain_core.embeddings import Embeddings
+
 from config.settings import settings
 
 
+# Number of distinct query embeddings kept per VectorStore
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Below this many vectors an exact flat scan is about as fast as an ANN
+# index and has perfect recall; IVF-PQ also needs this many to train
+FAISS_MIN_ANN_VECTORS = 10_000
+FAISS_MAX_TRAINING_VECTORS = 50_000
+
+# Index types that store compressed codes instead of float32 vectors
+FAISS_QUANTIZED_INDEX_TYPES = ("sq8", "hnsw_sq8", "ivfpq")
+
+# JSON file in db_path holding get_meta/set_meta values
+STORE_META_FILE = "store_meta.json"
+
+# Documents per add_documents_iter batch; the first batch trains the index
+DOCUMENT_BATCH_SIZE = FAISS_MAX_TRAINING_VECTORS
+
+# Metadata key on a stored FAISS document listing the metadata of documents
+# with identical text, which share its vector instead of getting their own
+DUPLICATES_METADATA_KEY = "duplicates"
+
+
+class _SentenceTransformerEmbeddings(Embeddings):
+    """LangChain Embeddings adapter around an already-loaded SentenceTransformer."""
+    
+    def __init__(self, model, batch_size: int):
+        self._model = model
+        self._batch_size = batch_size
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents."""
+        return self._model.encode(
+            texts,
+            batch_size=self._batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        return self._model.encode(
+            [text],
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )[0].tolist()
+
+
 class VectorStore:
     """Manages vector embeddings and semantic search."""
     
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(self, db_path: Optional[Path] = None, index_type: Optional[str] = None):
         """
         Initialize the vector store.
         
         Args:
             db_path: Path to store the vector database (defaults to settings.VECTOR_DB_PATH)
+            index_type: FAISS index type, "flat", "sq8", "hnsw", "hnsw_sq8" or "ivfpq"
+                (defaults to settings.FAISS_INDEX_TYPE)
         """
         self.db_path = db_path or settings.get_vector_db_path()
         self.store_type = settings.VECTOR_STORE_TYPE
+        self.index_type = (index_type or settings.FAISS_INDEX_TYPE).lower()
         self.embedding_model = settings.EMBEDDING_MODEL
+        self.embedding_batch_size = settings.EMBEDDING_BATCH_SIZE
         self.chunk_size = settings.CHUNK_SIZE
         self.chunk_overlap = settings.CHUNK_OVERLAP
         
         self._store = None
         self._embeddings = None
+        self._embedding_function = None
+        self._content_ids: Dict[bytes, str] = {}  # Text hash -> FAISS docstore id
         self._initialized = False
+        self._read_only = False  # Loaded for queries only (see load)
+        
+        # Per-instance LRU so repeated queries skip the embedding model
+        self._embed_query = functools.lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(
+            self._encode_query
+        )
     
     def _initialize_embeddings(self):
         """Initialize the embedding model."""
@@ -36,14 +102,23 @@ class VectorStore:
             from sentence_transformers import SentenceTransformer
             
             self._embeddings = SentenceTransformer(self.embedding_model)
+            # Share the loaded model with LangChain instead of loading it twice
+            self._embedding_function = _SentenceTransformerEmbeddings(
+                self._embeddings, self.embedding_batch_size
+            )
         except ImportError:
             raise ImportError(
                 "sentence-transformers not installed. "
                 "Install with: pip install sentence-transformers"
             )
     
-    def _initialize_store(self):
-        """Initialize the vector store (FAISS or Chroma)."""
+    def _initialize_store(self, read_only: bool = False):
+        """
+        Initialize the vector store (FAISS or Chroma).
+        
+        Args:
+            read_only: Load a persisted FAISS index for queries only
+        """
         if self._store is not None:
             return
         
@@ -53,23 +128,16 @@ class VectorStore:
             try:
                 import faiss
                 from langchain.vectorstores import FAISS
-                from langchain.embeddings import HuggingFaceEmbeddings
-                
-                # Use LangChain's FAISS with HuggingFace embeddings
-                embedding_function = HuggingFaceEmbeddings(
-                    model_name=self.embedding_model
-                )
                 
                 # Try to load existing store
                 store_path = self.db_path / "faiss_store"
-                if store_path.exists():
-                    self._store = FAISS.load_local(
-                        str(store_path), embeddings=embedding_function
-                    )
+                if (store_path / "index.faiss").exists():
+                    self._store = self._load_faiss_store(store_path, read_only)
+                    self._read_only = read_only
+                    self._initialized = True
                 else:
                     # Create new store
                     self._store = None  # Will be created when documents are added
-                    self._embedding_function = embedding_function
                     
             except ImportError:
                 raise ImportError(
@@ -80,18 +148,12 @@ class VectorStore:
             try:
                 import chromadb
                 from langchain.vectorstores import Chroma
-                from langchain.embeddings import HuggingFaceEmbeddings
-                
-                embedding_function = HuggingFaceEmbeddings(
-                    model_name=self.embedding_model
-                )
                 
                 persist_directory = str(self.db_path / "chroma_db")
                 self._store = Chroma(
                     persist_directory=persist_directory,
-                    embedding_function=embedding_function,
+                    embedding_function=self._embedding_function,
                 )
-                self._embedding_function = embedding_function
                 
             except ImportError:
                 raise ImportError(
@@ -100,10 +162,256 @@ class VectorStore:
         else:
             raise ValueError(f"Unsupported store type: {self.store_type}")
     
+    def _load_faiss_store(self, store_path: Path, read_only: bool = False):
+        """
+        Load a persisted FAISS store, memory-mapping the index file where possible.
+        
+        Args:
+            store_path: Directory written by _persist
+            read_only: The store will only be queried, so IVF inverted lists
+                can stay memory-mapped too
+            
+        Returns:
+            LangChain FAISS store
+        """
+        import pickle
+        import faiss
+        from langchain.vectorstores import FAISS
+        
+        # With IO_FLAG_MMAP the OS page cache handles residency: index pages
+        # are faulted in by the first queries that touch them instead of
+        # being read up front
+        index_file = str(store_path / "index.faiss")
+        if read_only:
+            index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        else:
+            index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP)
+        if not read_only and faiss.try_extract_index_ivf(index) is not None:
+            # Memory-mapped IVF inverted lists are read-only, so add() after a
+            # reload would fail; IVF indexes are read fully into memory
+            index = faiss.read_index(index_file)
+        with open(store_path / "index.pkl", "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        
+        self._content_ids.update(
+            (self._content_hash(doc.page_content), doc_id)
+            for doc_id, doc in docstore._dict.items()
+        )
+        
+        return FAISS(
+            embedding_function=self._embedding_function,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+        )
+    
+    def _build_faiss_index(self, training_vectors):
+        """
+        Build an empty FAISS index of the configured index type.
+        
+        Collections smaller than FAISS_MIN_ANN_VECTORS get a flat index
+        (int8-coded for the quantized types); build_index upgrades it once
+        the collection grows.
+        
+        Args:
+            training_vectors: First batch of vectors, used to train
+                quantized indexes before anything is added
+            
+        Returns:
+            faiss.Index ready for add()
+        """
+        import faiss
+        import numpy as np
+        
+        dim = self._embeddings.get_sentence_embedding_dimension()
+        index_type = self.index_type
+        num_vectors = len(training_vectors)
+        
+        quantized = index_type in FAISS_QUANTIZED_INDEX_TYPES
+        if index_type == "flat" or (num_vectors < FAISS_MIN_ANN_VECTORS and not quantized):
+            return faiss.IndexFlatL2(dim)
+        
+        # Train quantizers on at most FAISS_MAX_TRAINING_VECTORS samples
+        if num_vectors > FAISS_MAX_TRAINING_VECTORS:
+            rng = np.random.default_rng(0)
+            sample = training_vectors[
+                rng.choice(num_vectors, FAISS_MAX_TRAINING_VECTORS, replace=False)
+            ]
+        else:
+            sample = training_vectors
+        sample = np.ascontiguousarray(sample, dtype=np.float32)
+        
+        if index_type == "sq8" or num_vectors < FAISS_MIN_ANN_VECTORS:
+            # Exhaustive scan over 1-byte-per-dimension codes: a quarter of
+            # the memory traffic of IndexFlatL2
+            index = faiss.IndexScalarQuantizer(
+                dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2
+            )
+            index.train(sample)
+            return index
+        
+        if index_type == "ivfpq":
+            # Product quantization packs each vector into a few dozen bytes,
+            # so large, memory-bandwidth-bound scans move far fewer bytes
+            subquantizers = max(m for m in range(1, 33) if dim % m == 0)
+            nlist = min(1024, num_vectors // 39)
+            index = faiss.index_factory(
+                dim, f"OPQ{subquantizers},IVF{nlist},PQ{subquantizers}"
+            )
+            index.train(sample)
+            faiss.extract_index_ivf(index).nprobe = settings.FAISS_IVF_NPROBE
+            return index
+        
+        if index_type == "hnsw_sq8":
+            # 8-bit scalar quantization keeps HNSW but stores 1 byte per
+            # dimension instead of 4
+            index = faiss.IndexHNSWSQ(
+                dim, faiss.ScalarQuantizer.QT_8bit, settings.FAISS_HNSW_M
+            )
+            index.train(sample)
+        else:
+            # HNSW gives approximate search that touches O(log N) vectors per
+            # query instead of the exhaustive scan of the default IndexFlatL2
+            index = faiss.IndexHNSWFlat(dim, settings.FAISS_HNSW_M)
+        
+        index.hnsw.efConstruction = settings.FAISS_HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = settings.FAISS_HNSW_EF_SEARCH
+        return index
+    
+    def _create_faiss_store(self, training_vectors):
+        """Create an empty FAISS store around a freshly built index."""
+        from langchain.vectorstores import FAISS
+        from langchain.docstore.in_memory import InMemoryDocstore
+        
+        return FAISS(
+            embedding_function=self._embedding_function,
+            index=self._build_faiss_index(training_vectors),
+            docstore=InMemoryDocstore({}),
+            index_to_docstore_id={},
+        )
+    
+    @staticmethod
+    def _content_hash(text: str) -> bytes:
+        """Hash document text for duplicate detection."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    
+    def embed_texts(self, texts: List[str]):
+        """
+        Embed texts in fixed-size batches with the already-loaded SentenceTransformer.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            float32 numpy array of shape (len(texts), dim) with normalized embeddings
+        """
+        import numpy as np
+        
+        self._initialize_embeddings()
+        
+        # Fill row slices of one pre-sized array instead of concatenating
+        # per-batch results
+        dim = self._embeddings.get_sentence_embedding_dimension()
+        vectors = np.empty((len(texts), dim), dtype=np.float32)
+        batch_size = self.embedding_batch_size
+        
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            vectors[start:start + len(batch)] = self._embeddings.encode(
+                batch,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+        
+        return vectors
+    
+    def _encode_query(self, query: str) -> Tuple[float, ...]:
+        """Embed a single query (stored as a tuple so it can be cached)."""
+        vector = self._embeddings.encode(
+            [query],
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )[0]
+        return tuple(vector.tolist())
+    
+    @property
+    def size(self) -> int:
+        """Number of vectors currently in the store."""
+        if self._store is None:
+            return 0
+        if self.store_type.lower() == "faiss":
+            return self._store.index.ntotal
+        return self._store._collection.count()
+    
+    def build_index(self) -> bool:
+        """
+        Rebuild a flat (or int8 flat) FAISS index as the configured ANN index once it is big enough.
+        
+        Stores start out flat while small (see _build_faiss_index); call this
+        after adding documents so a grown collection switches to sub-linear
+        search.
+        
+        Returns:
+            True if the index was rebuilt
+        """
+        if self.store_type.lower() != "faiss" or self._store is None:
+            return False
+        if self.index_type in ("flat", "sq8") or self.size < FAISS_MIN_ANN_VECTORS:
+            return False
+        
+        import faiss
+        
+        old_index = self._store.index
+        if not isinstance(old_index, (faiss.IndexFlat, faiss.IndexScalarQuantizer)):
+            return False
+        
+        # Flat indexes store every vector (raw or 8-bit coded), so they can be
+        # read back and re-added in order
+        vectors = old_index.reconstruct_n(0, old_index.ntotal)
+        index = self._build_faiss_index(vectors)
+        index.add(vectors)
+        self._store.index = index
+        self._persist()
+        return True
+    
+    def has_persisted_index(self) -> bool:
+        """Check if a persisted store exists on disk, without loading any model."""
+        if self.store_type.lower() == "faiss":
+            return (self.db_path / "faiss_store" / "index.faiss").exists()
+        elif self.store_type.lower() == "chroma":
+            return (self.db_path / "chroma_db").exists()
+        return False
+    
     def is_initialized(self) -> bool:
         """Check if the vector store is initialized."""
         return self._initialized and self._store is not None
     
+    def load(self, read_only: bool = False) -> bool:
+        """
+        Load the persisted store, if there is one and it is not loaded yet.
+        
+        Loading reads the embedding model and the index, so callers that only
+        need to know whether an index exists should use has_persisted_index.
+        
+        Args:
+            read_only: The store will only be queried; a later write reloads
+                it writable
+            
+        Returns:
+            True if a store is ready (same as is_initialized afterwards)
+        """
+        if self._store is not None and self._read_only and not read_only:
+            # Swap a query-only index for a writable one before any write
+            self._store = None
+            self._initialized = False
+        
+        if self._store is None and self.has_persisted_index():
+            self._initialize_store(read_only=read_only)
+        return self.is_initialized()
+    
     def add_documents(self, documents: List[Dict[str, Any]]):
         """
         Add documents to the vector store.
@@ -114,70 +422,373 @@ class VectorStore:
         if not documents:
             return
         
+        if self._add_batch(documents):
+            self._persist()
+            self._initialized = True
+    
+    def add_documents_iter(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: int = DOCUMENT_BATCH_SIZE,
+    ) -> int:
+        """
+        Add documents from an iterable, embedding and indexing one batch at a time.
+        
+        Only one batch of documents is held in memory at once. The first
+        batch also trains quantized FAISS indexes, so the default batch size
+        matches the training sample cap.
+        
+        Args:
+            documents: Iterable of dicts with 'content' and 'metadata' keys
+            batch_size: Number of documents per batch
+            
+        Returns:
+            Number of documents consumed from the iterable
+        """
+        count = 0
+        added = False
+        batch = []
+        
+        for doc in documents:
+            batch.append(doc)
+            count += 1
+            if len(batch) >= batch_size:
+                added |= self._add_batch(batch)
+                batch = []
+        
+        if batch:
+            added |= self._add_batch(batch)
+        
+        # Persist once at the end rather than after every batch
+        if added:
+            self._persist()
+            self._initialized = True
+        
+        return count
+    
+    def _add_batch(self, documents: List[Dict[str, Any]]) -> bool:
+        """
+        Embed and index one batch of documents without persisting.
+        
+        Args:
+            documents: List of dicts with 'content' and 'metadata' keys
+            
+        Returns:
+            True if the store changed
+        """
+        self.load()
         self._initialize_store()
         
-        # Extract texts and metadatas
-        texts = [doc["content"] for doc in documents]
-        metadatas = [doc.get("metadata", {}) for doc in documents]
+        if self.store_type.lower() == "chroma":
+            # Chroma handles persistence automatically
+            self._store.add_texts(
+                texts=[doc["content"] for doc in documents],
+                metadatas=[doc.get("metadata", {}) for doc in documents],
+            )
+            return True
         
-        if self.store_type.lower() == "faiss":
-            from langchain.vectorstores import FAISS
-            
-            if self._store is None:
-                # Create new store
-                self._store = FAISS.from_texts(
-                    texts=texts,
-                    embedding=self._embedding_function,
-                    metadatas=metadatas,
-                )
-            else:
-                # Add to existing store
-                self._store.add_texts(texts=texts, metadatas=metadatas)
+        # Identical chunks (license headers, empty modules, generated code)
+        # would each cost a forward pass and an index slot. Only the first is
+        # embedded; the others' metadata is recorded on it
+        unique = {}  # Text hash -> (text, metadata) of the first copy in this batch
+        changed = False
+        for doc in documents:
+            text = doc["content"]
+            metadata = doc.get("metadata", {})
+            digest = self._content_hash(text)
             
-            # Save
+            doc_id = self._content_ids.get(digest)
+            if doc_id is not None:
+                self._add_duplicate(self._store.docstore.search(doc_id), metadata)
+                changed = True
+            elif digest in unique:
+                unique[digest][1][DUPLICATES_METADATA_KEY] = [
+                    *unique[digest][1].get(DUPLICATES_METADATA_KEY, ()), metadata
+                ]
+            else:
+                unique[digest] = (text, dict(metadata))
+        
+        if not unique:
+            return changed
+        
+        texts = [text for text, _ in unique.values()]
+        metadatas = [metadata for _, metadata in unique.values()]
+        
+        # Embed in EMBEDDING_BATCH_SIZE forward passes
+        vectors = self.embed_texts(texts)
+        
+        if self._store is None:
+            # Create new store
+            self._store = self._create_faiss_store(vectors)
+        
+        doc_ids = self._store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+        self._content_ids.update(zip(unique, doc_ids))
+        return True
+    
+    @staticmethod
+    def _add_duplicate(doc, metadata: Dict[str, Any]):
+        """Record the metadata of a document whose text is identical to doc's."""
+        # Lists are replaced, never mutated, since search results share them
+        doc.metadata = {
+            **doc.metadata,
+            DUPLICATES_METADATA_KEY: [*doc.metadata.get(DUPLICATES_METADATA_KEY, ()), metadata],
+        }
+    
+    def _persist(self):
+        """Save the FAISS store to disk (Chroma persists on its own)."""
+        if self.store_type.lower() == "faiss":
             store_path = self.db_path / "faiss_store"
             store_path.mkdir(parents=True, exist_ok=True)
             self._store.save_local(str(store_path))
-        
-        elif self.store_type.lower() == "chroma":
-            # Chroma handles persistence automatically
-            self._store.add_texts(texts=texts, metadatas=metadatas)
-        
-        self._initialized = True
     
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def embed_query(self, query: str) -> List[float]:
         """
-        Search the vector store for similar documents.
+        Embed a search query, reusing the cached vector for repeated queries.
         
         Args:
             query: Search query
+            
+        Returns:
+            Normalized query embedding
+        """
+        self._initialize_embeddings()
+        return list(self._embed_query(query))
+    
+    def search_by_vector(self, vector: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search the vector store with an already-computed query embedding.
+        
+        Args:
+            vector: Query embedding (see embed_query)
             top_k: Number of results to return
             
         Returns:
-            List of dictionaries with 'content', 'metadata', and 'score' keys
+            List of dictionaries with exactly 'content', 'metadata', and 'score' keys
         """
-        if not self.is_initialized():
+        if not self.load(read_only=True):
             return []
         
-        try:
-            results = self._store.similarity_search_with_score(
-                query, k=top_k
+        if self.store_type.lower() == "faiss":
+            results = self._store.similarity_search_with_score_by_vector(
+                vector, k=top_k
+            )
+        else:
+            results = self._store.similarity_search_by_vector_with_relevance_scores(
+                vector, k=top_k
             )
+        
+        formatted_results = []
+        for doc, score in results:
+            formatted_results.append({
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "score": float(score),
+            })
+        
+        return formatted_results
+    
+    def search_by_vectors(self, vectors, top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Search the vector store for many query embeddings at once.
+        
+        Args:
+            vectors: Array of shape (num_queries, dim), e.g. from embed_texts
+            top_k: Number of results to return per query
             
-            formatted_results = []
-            for doc, score in results:
-                formatted_results.append({
+        Returns:
+            One result list per query, each shaped like search_by_vector's
+        """
+        if not self.load(read_only=True):
+            return [[] for _ in range(len(vectors))]
+        
+        if self.store_type.lower() != "faiss":
+            return [self.search_by_vector(list(vector), top_k=top_k) for vector in vectors]
+        
+        import numpy as np
+        
+        # One index.search call for the whole batch instead of one per query
+        store = self._store
+        distances, indices = store.index.search(
+            np.ascontiguousarray(vectors, dtype=np.float32), top_k
+        )
+        
+        all_results = []
+        for row_distances, row_indices in zip(distances.tolist(), indices.tolist()):
+            results = []
+            for distance, i in zip(row_distances, row_indices):
+                if i == -1:
+                    # Fewer than top_k vectors in the index
+                    continue
+                doc = store.docstore.search(store.index_to_docstore_id[i])
+                results.append({
                     "content": doc.page_content,
                     "metadata": doc.metadata,
-                    "score": float(score),
+                    "score": distance,
                 })
+            all_results.append(results)
+        
+        return all_results
+    
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search the vector store for similar documents.
+        
+        Args:
+            query: Search query
+            top_k: Number of results to return
             
-            return formatted_results
+        Returns:
+            List of dictionaries with 'content', 'metadata', and 'score' keys
+        """
+        if not self.load(read_only=True):
+            return []
+        
+        try:
+            return self.search_by_vector(self.embed_query(query), top_k=top_k)
             
         except Exception as e:
             print(f"Search error: {e}")
             return []
     
+    def delete_by_metadata(self, key: str, values: Iterable[Any]) -> int:
+        """
+        Delete every document whose metadata[key] is one of values.
+        
+        A FAISS document whose text is shared with surviving duplicates is
+        kept and takes over the metadata of the first of them.
+        
+        Args:
+            key: Metadata key to match on (e.g. "file_path")
+            values: Metadata values whose documents should be removed
+            
+        Returns:
+            Number of documents deleted (Chroma reports 0, it does not say)
+        """
+        values = set(values)
+        if not values or not self.load():
+            return 0
+        
+        if self.store_type.lower() == "chroma":
+            self._store._collection.delete(where={key: {"$in": list(values)}})
+            return 0
+        
+        store = self._store
+        doomed = {}
+        num_deleted = 0
+        for doc_id, doc in store.docstore._dict.items():
+            duplicates = doc.metadata.get(DUPLICATES_METADATA_KEY, ())
+            kept = [metadata for metadata in duplicates if metadata.get(key) not in values]
+            matched = doc.metadata.get(key) in values
+            if not matched and len(kept) == len(duplicates):
+                continue
+            num_deleted += matched + len(duplicates) - len(kept)
+            
+            if matched:
+                if not kept:
+                    doomed[doc_id] = doc
+                    continue
+                # Same text, same vector: the first surviving duplicate
+                # takes over the stored document
+                metadata, kept = dict(kept[0]), kept[1:]
+            else:
+                metadata = {
+                    k: v for k, v in doc.metadata.items() if k != DUPLICATES_METADATA_KEY
+                }
+            if kept:
+                metadata[DUPLICATES_METADATA_KEY] = kept
+            doc.metadata = metadata
+        
+        if not num_deleted:
+            return 0
+        
+        if doomed:
+            # Deleted texts may be added again later, so forget their hashes
+            for doc in doomed.values():
+                self._content_ids.pop(self._content_hash(doc.page_content), None)
+            
+            try:
+                store.delete(list(doomed))
+            except RuntimeError:
+                # HNSW and memory-mapped indexes do not support remove_ids
+                self._rebuild_faiss_without(doomed.keys())
+        
+        self._persist()
+        return num_deleted
+    
+    def _rebuild_faiss_without(self, doc_ids: Iterable[str]):
+        """Rebuild the FAISS index keeping every document except doc_ids."""
+        import numpy as np
+        
+        store = self._store
+        doc_ids = set(doc_ids)
+        kept = [
+            (position, doc_id)
+            for position, doc_id in sorted(store.index_to_docstore_id.items())
+            if doc_id not in doc_ids
+        ]
+        
+        try:
+            # Read the kept vectors back from the index when it supports it
+            all_vectors = store.index.reconstruct_n(0, store.index.ntotal)
+            vectors = all_vectors[[position for position, _ in kept]]
+        except RuntimeError:
+            # e.g. IVF-PQ without a direct map: embed the kept texts again
+            vectors = self.embed_texts([
+                store.docstore.search(doc_id).page_content for _, doc_id in kept
+            ])
+        
+        if kept:
+            index = self._build_faiss_index(np.ascontiguousarray(vectors, dtype=np.float32))
+            index.add(vectors)
+        else:
+            # Nothing left to train a quantized index on
+            import faiss
+            index = faiss.IndexFlatL2(self._embeddings.get_sentence_embedding_dimension())
+        store.index = index
+        store.index_to_docstore_id = {
+            position: doc_id for position, (_, doc_id) in enumerate(kept)
+        }
+        store.docstore.delete(list(doc_ids))
+    
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """
+        Read a value persisted alongside the store.
+        
+        Args:
+            key: Metadata key
+            default: Returned if the key was never set
+            
+        Returns:
+            The stored JSON value, or default
+        """
+        meta_path = self.db_path / STORE_META_FILE
+        if not meta_path.exists():
+            return default
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f).get(key, default)
+    
+    def set_meta(self, key: str, value: Any):
+        """
+        Persist a JSON-serializable value alongside the store.
+        
+        Args:
+            key: Metadata key
+            value: Value to store
+        """
+        meta_path = self.db_path / STORE_META_FILE
+        meta = {}
+        if meta_path.exists():
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        meta[key] = value
+        
+        self.db_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = meta_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        # Atomic swap so a crash never leaves a half-written file
+        os.replace(tmp_path, meta_path)
+    
     def clear(self):
         """Clear the vector store."""
         if self.store_type.lower() == "faiss":
@@ -192,5 +803,10 @@ class VectorStore:
                 import shutil
                 shutil.rmtree(persist_directory)
         
+        meta_path = self.db_path / STORE_META_FILE
+        if meta_path.exists():
+            meta_path.unlink()
+        
         self._store = None
+        self._content_ids.clear()
         self._initialized = False
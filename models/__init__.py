@@ -6,11 +6,13 @@ from .ast_models import (
     ImportNode,
     VariableNode,
     FileASTInfo,
+    ASTStore,
 )
 from .analysis_models import (
     FileDependency,
     FileAnalysis,
     CodebaseAnalysis,
+    DependencyGraphCSR,
     RiskScore,
 )
 from .agent_models import AgentState, ToolResponse
@@ -21,9 +23,11 @@ __all__ = [
     "ImportNode",
     "VariableNode",
     "FileASTInfo",
+    "ASTStore",
     "FileDependency",
     "FileAnalysis",
     "CodebaseAnalysis",
+    "DependencyGraphCSR",
     "RiskScore",
     "AgentState",
     "ToolResponse",
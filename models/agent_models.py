@@ -6,7 +6,7 @@ from .ast_models import FileASTInfo
 from .analysis_models import CodebaseAnalysis
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResponse:
     """Response from a tool execution."""
     success: bool
@@ -15,7 +15,7 @@ class ToolResponse:
     error: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentState:
     """State maintained by the LangGraph agent."""
     # User input
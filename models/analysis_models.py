@@ -1,9 +1,12 @@
 """Analysis and dependency models."""
 
-from typing import List, Dict, Set, Optional, Any
+import sys
+from typing import AbstractSet, List, Dict, Set, Optional, Any, Iterable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
+import numpy as np
+
 
 class DependencyType(str, Enum):
     """Type of dependency relationship."""
@@ -13,17 +16,33 @@ class DependencyType(str, Enum):
     REFERENCE = "reference"  # Other references (variables, etc.)
 
 
-@dataclass
+@dataclass(slots=True)
 class FileDependency:
     """Represents a dependency from one file to another."""
     source_file: str
     target_file: str
     dependency_type: DependencyType
-    details: Dict[str, Any] = field(default_factory=dict)  # What specifically is used
+    module: str = ""  # Imported module, as written
+    imported_items: List[str] = field(default_factory=list)  # For "from X import a, b"
+    import_type: str = "import"  # "import", "from_import", "from_import_all"
     strength: float = 1.0  # 0.0 to 1.0, how strong the dependency is
+    
+    def __post_init__(self):
+        # The same paths recur across every edge; share one string object
+        self.source_file = sys.intern(self.source_file)
+        self.target_file = sys.intern(self.target_file)
+    
+    @property
+    def details(self) -> Dict[str, Any]:
+        """What specifically is used, built only when asked for."""
+        return {
+            "module": self.module,
+            "imported_items": self.imported_items,
+            "import_type": self.import_type,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class RiskScore:
     """Risk assessment for a file."""
     overall_score: float  # 0.0 to 1.0
@@ -31,7 +50,7 @@ class RiskScore:
     explanation: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class FileAnalysis:
     """Complete analysis for a single file."""
     file_path: str
@@ -39,20 +58,137 @@ class FileAnalysis:
     dependents: List[str] = field(default_factory=list)  # Files that depend on this
     complexity_metrics: Dict[str, float] = field(default_factory=dict)  # Lines, nesting, etc.
     risk_score: Optional[RiskScore] = None
-    function_usage: Dict[str, Set[str]] = field(default_factory=dict)  # func_name -> {files that use it}
-    class_usage: Dict[str, Set[str]] = field(default_factory=dict)  # class_name -> {files that use it}
+    function_usage: Dict[str, AbstractSet[str]] = field(default_factory=dict)  # func_name -> {files that use it}
+    class_usage: Dict[str, AbstractSet[str]] = field(default_factory=dict)  # class_name -> {files that use it}
+    
+    def __post_init__(self):
+        self.file_path = sys.intern(self.file_path)
     
     def get_impact_score(self) -> float:
         """Calculate impact: how many files are affected by changes here."""
         return len(self.dependents) / max(1, len(self.dependencies) + len(self.dependents))
 
 
-@dataclass
+@dataclass(slots=True)
+class DependencyGraphCSR:
+    """
+    File dependency graph in compressed sparse row form.
+    
+    File paths are interned to int32 ids; the neighbours of node u are
+    indices[indptr[u]:indptr[u + 1]], sorted by id.
+    """
+    id_to_path: List[str]
+    path_to_id: Dict[str, int]
+    indptr: np.ndarray  # int64, shape (num_nodes + 1,)
+    indices: np.ndarray  # int32, shape (num_edges,)
+    
+    @classmethod
+    def from_edges(
+        cls, paths: List[str], edges: Iterable[Tuple[str, str]]
+    ) -> "DependencyGraphCSR":
+        """
+        Build the graph once all edges are known.
+        
+        Args:
+            paths: All node paths; their order defines the ids
+            edges: (source, target) path pairs, targets must be in paths
+            
+        Returns:
+            DependencyGraphCSR over the given nodes
+        """
+        path_to_id = {path: i for i, path in enumerate(paths)}
+        pairs = np.array(
+            [(path_to_id[source], path_to_id[target]) for source, target in edges],
+            dtype=np.int32,
+        ).reshape(-1, 2)
+        return cls._from_id_pairs(list(paths), path_to_id, pairs[:, 0], pairs[:, 1])
+    
+    @classmethod
+    def _from_id_pairs(
+        cls,
+        id_to_path: List[str],
+        path_to_id: Dict[str, int],
+        sources: np.ndarray,
+        targets: np.ndarray,
+    ) -> "DependencyGraphCSR":
+        """Build the CSR arrays from parallel source/target id arrays."""
+        order = np.lexsort((targets, sources))
+        sources = sources[order]
+        indices = np.ascontiguousarray(targets[order], dtype=np.int32)
+        indptr = np.searchsorted(sources, np.arange(len(id_to_path) + 1)).astype(np.int64)
+        return cls(
+            id_to_path=id_to_path,
+            path_to_id=path_to_id,
+            indptr=indptr,
+            indices=indices,
+        )
+    
+    @property
+    def num_nodes(self) -> int:
+        """Number of files in the graph."""
+        return len(self.id_to_path)
+    
+    def reversed(self) -> "DependencyGraphCSR":
+        """Build the graph with every edge flipped (dependencies -> dependents)."""
+        sources = np.repeat(
+            np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr)
+        )
+        return self._from_id_pairs(
+            self.id_to_path, self.path_to_id, self.indices, sources
+        )
+    
+    def neighbors(self, node_id: int) -> np.ndarray:
+        """Get the neighbour ids of a node as a view into indices."""
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+    
+    def neighbor_paths(self, file_path: str) -> List[str]:
+        """Get the neighbour paths of a file (empty if the file is unknown)."""
+        node_id = self.path_to_id.get(file_path)
+        if node_id is None:
+            return []
+        id_to_path = self.id_to_path
+        return [id_to_path[i] for i in self.neighbors(node_id).tolist()]
+    
+    def reachable(self, file_path: str) -> Set[str]:
+        """
+        Find every file reachable from a file, excluding the file itself.
+        
+        Args:
+            file_path: Start of the traversal
+            
+        Returns:
+            Set of reachable file paths
+        """
+        start = self.path_to_id.get(file_path)
+        if start is None:
+            return set()
+        
+        # Frontier-at-a-time BFS: each level is one vectorised gather
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        while frontier.size:
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            if not counts.sum():
+                break
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+            candidates = self.indices[offsets + np.arange(counts.sum())]
+            frontier = np.unique(candidates[~visited[candidates]]).astype(np.int64)
+            visited[frontier] = True
+        
+        visited[start] = False
+        return {self.id_to_path[i] for i in np.flatnonzero(visited).tolist()}
+
+
+@dataclass(slots=True)
 class CodebaseAnalysis:
     """Complete analysis of the entire codebase."""
     files: Dict[str, FileAnalysis] = field(default_factory=dict)  # file_path -> FileAnalysis
     dependency_graph: Dict[str, Set[str]] = field(default_factory=dict)  # file -> {dependencies}
     reverse_dependency_graph: Dict[str, Set[str]] = field(default_factory=dict)  # file -> {dependents}
+    dependency_csr: Optional[DependencyGraphCSR] = None  # Same edges as dependency_graph
+    reverse_dependency_csr: Optional[DependencyGraphCSR] = None  # Same edges as reverse_dependency_graph
     total_files: int = 0
     total_lines: int = 0
     most_risky_files: List[str] = field(default_factory=list)  # Sorted by risk
@@ -64,8 +200,32 @@ class CodebaseAnalysis:
     
     def get_dependencies(self, file_path: str) -> List[str]:
         """Get all files that the given file depends on."""
+        if self.dependency_csr is not None:
+            return self.dependency_csr.neighbor_paths(file_path)
         return list(self.dependency_graph.get(file_path, set()))
     
     def get_dependents(self, file_path: str) -> List[str]:
         """Get all files that depend on the given file."""
+        if self.reverse_dependency_csr is not None:
+            return self.reverse_dependency_csr.neighbor_paths(file_path)
         return list(self.reverse_dependency_graph.get(file_path, set()))
+    
+    def get_transitive_dependents(self, file_path: str) -> Set[str]:
+        """Get all files affected, directly or indirectly, by changes to the given file."""
+        if self.reverse_dependency_csr is not None:
+            return self.reverse_dependency_csr.reachable(file_path)
+        
+        # Breadth-first search over the dict graph
+        graph = self.reverse_dependency_graph
+        affected = set()
+        frontier = [file_path]
+        while frontier:
+            next_frontier = []
+            for current in frontier:
+                for dependent in graph.get(current, ()):
+                    if dependent not in affected:
+                        affected.add(dependent)
+                        next_frontier.append(dependent)
+            frontier = next_frontier
+        affected.discard(file_path)
+        return affected
@@ -1,5 +1,6 @@
 """AST-derived data models for code structure."""
 
+import sys
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, field
 from enum import Enum
@@ -14,7 +15,7 @@ class NodeType(str, Enum):
     IMPORT = "import"
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionNode:
     """Represents a function or method in the code."""
     name: str
@@ -27,9 +28,15 @@ class FunctionNode:
     is_async: bool = False
     is_method: bool = False  # True if part of a class
     parent_class: Optional[str] = None  # If method, which class
+    
+    def __post_init__(self):
+        # Names repeat across files and usage maps; share one string object
+        self.name = sys.intern(self.name)
+        if self.parent_class is not None:
+            self.parent_class = sys.intern(self.parent_class)
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassNode:
     """Represents a class in the code."""
     name: str
@@ -39,18 +46,24 @@ class ClassNode:
     decorators: List[str] = field(default_factory=list)
     docstring: Optional[str] = None
     methods: List[FunctionNode] = field(default_factory=list)
+    
+    def __post_init__(self):
+        self.name = sys.intern(self.name)
 
 
-@dataclass
+@dataclass(slots=True)
 class ImportNode:
     """Represents an import statement."""
     module: str  # Full module path (e.g., "os.path" or "from os import path")
     alias: Optional[str] = None  # If "import os as o", alias is "o"
     imported_items: List[str] = field(default_factory=list)  # For "from X import a, b"
     import_type: str = "import"  # "import", "from_import", "from_import_all"
+    
+    def __post_init__(self):
+        self.module = sys.intern(self.module)
 
 
-@dataclass
+@dataclass(slots=True)
 class VariableNode:
     """Represents a global variable or constant."""
     name: str
@@ -60,7 +73,7 @@ class VariableNode:
     is_constant: bool = False  # True if in ALL_CAPS
 
 
-@dataclass
+@dataclass(slots=True)
 class FileASTInfo:
     """Complete AST information for a single file."""
     file_path: str
@@ -73,6 +86,30 @@ class FileASTInfo:
     code_lines: int = 0  # Excluding comments/blank lines
     parse_error: Optional[str] = None  # If AST parsing failed
     
+    def __post_init__(self):
+        self.file_path = sys.intern(self.file_path)
+    
+    def intern_strings(self) -> "FileASTInfo":
+        """
+        Re-intern the strings __post_init__ interns.
+        
+        Unpickling (the AST cache, process pool results) skips __post_init__,
+        so objects from those sources call this before they are merged.
+        
+        Returns:
+            This object, for chaining
+        """
+        self.file_path = sys.intern(self.file_path)
+        for func in self.functions:
+            func.__post_init__()
+        for cls in self.classes:
+            cls.__post_init__()
+            for method in cls.methods:
+                method.__post_init__()
+        for imp in self.imports:
+            imp.__post_init__()
+        return self
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
         return {
@@ -128,3 +165,68 @@ class FileASTInfo:
             "code_lines": self.code_lines,
             "parse_error": self.parse_error,
         }
+    
+    def to_json(self) -> bytes:
+        """
+        Serialize to JSON bytes in a single C-level pass.
+        
+        Unlike to_dict, class methods are emitted as full function records.
+        
+        Returns:
+            UTF-8 encoded JSON document
+        """
+        try:
+            import orjson
+        except ImportError:
+            raise ImportError("orjson not installed. Install with: pip install orjson")
+        
+        # orjson serializes (slotted) dataclasses natively, without asdict copies
+        return orjson.dumps(self)
+
+
+@dataclass(slots=True)
+class ASTStore:
+    """
+    Columnar (structure-of-arrays) view over many parsed files.
+    
+    Each node kind lives in one flat list with a parallel column of file ids,
+    so passes over e.g. all imports in the codebase are a single list walk.
+    """
+    files: List[str] = field(default_factory=list)  # file_id -> file path
+    functions: List[FunctionNode] = field(default_factory=list)
+    function_file: List[int] = field(default_factory=list)  # file_id per function
+    classes: List[ClassNode] = field(default_factory=list)
+    class_file: List[int] = field(default_factory=list)  # file_id per class
+    imports: List[ImportNode] = field(default_factory=list)
+    import_file: List[int] = field(default_factory=list)  # file_id per import
+    
+    @classmethod
+    def from_files(cls, scanned_files: Dict[str, FileASTInfo]) -> "ASTStore":
+        """Build a store from a file_path -> FileASTInfo mapping."""
+        store = cls()
+        for file_path, ast_info in scanned_files.items():
+            store.add_file(file_path, ast_info)
+        return store
+    
+    def add_file(self, file_path: str, ast_info: FileASTInfo) -> int:
+        """
+        Append one file's nodes to the columns.
+        
+        Args:
+            file_path: Path of the file
+            ast_info: Parsed information for the file
+            
+        Returns:
+            The file_id assigned to the file
+        """
+        file_id = len(self.files)
+        self.files.append(file_path)
+        
+        self.functions.extend(ast_info.functions)
+        self.function_file.extend([file_id] * len(ast_info.functions))
+        self.classes.extend(ast_info.classes)
+        self.class_file.extend([file_id] * len(ast_info.classes))
+        self.imports.extend(ast_info.imports)
+        self.import_file.extend([file_id] * len(ast_info.imports))
+        
+        return file_id
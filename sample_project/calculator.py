@@ -2,18 +2,30 @@
 Calculator module with basic arithmetic operations.
 """
 
+import math
+
 from utils.validators import validate_number
 from logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Bound once so the scientific operations skip the module attribute lookup
+_pow = math.pow
+_sqrt = math.sqrt
+
 
 class Calculator:
     """A simple calculator class for basic arithmetic operations."""
     
-    def __init__(self):
-        """Initialize the calculator."""
+    def __init__(self, history_enabled: bool = True):
+        """
+        Initialize the calculator.
+        
+        Args:
+            history_enabled: Record each operation in the history (default: True)
+        """
         self.history = []
+        self._history_enabled = history_enabled
         logger.debug("Calculator initialized")
     
     def add(self, a: float, b: float) -> float:
@@ -30,7 +42,8 @@ class Calculator:
         validate_number(a)
         validate_number(b)
         result = a + b
-        self.history.append(f"{a} + {b} = {result}")
+        if self._history_enabled:
+            self.history.append(f"{a} + {b} = {result}")
         return result
     
     def subtract(self, a: float, b: float) -> float:
@@ -47,7 +60,8 @@ class Calculator:
         validate_number(a)
         validate_number(b)
         result = a - b
-        self.history.append(f"{a} - {b} = {result}")
+        if self._history_enabled:
+            self.history.append(f"{a} - {b} = {result}")
         return result
     
     def multiply(self, a: float, b: float) -> float:
@@ -64,7 +78,8 @@ class Calculator:
         validate_number(a)
         validate_number(b)
         result = a * b
-        self.history.append(f"{a} * {b} = {result}")
+        if self._history_enabled:
+            self.history.append(f"{a} * {b} = {result}")
         return result
     
     def divide(self, a: float, b: float) -> float:
@@ -86,7 +101,8 @@ class Calculator:
         if b == 0:
             raise ValueError("Cannot divide by zero")
         result = a / b
-        self.history.append(f"{a} / {b} = {result}")
+        if self._history_enabled:
+            self.history.append(f"{a} / {b} = {result}")
         return result
     
     def get_history(self) -> list:
@@ -95,21 +111,21 @@ class Calculator:
     
     def clear_history(self):
         """Clear calculation history."""
+        cleared = len(self.history)
         self.history.clear()
-        logger.info("History cleared")
+        logger.info("History cleared: %d entries", cleared)
 
 
 class ScientificCalculator(Calculator):
     """Extended calculator with scientific functions."""
     
-    import math
-    
     def power(self, base: float, exponent: float) -> float:
         """Raise base to the power of exponent."""
         validate_number(base)
         validate_number(exponent)
-        result = self.math.pow(base, exponent)
-        self.history.append(f"{base} ^ {exponent} = {result}")
+        result = _pow(base, exponent)
+        if self._history_enabled:
+            self.history.append(f"{base} ^ {exponent} = {result}")
         return result
     
     def sqrt(self, number: float) -> float:
@@ -117,6 +133,7 @@ class ScientificCalculator(Calculator):
         validate_number(number)
         if number < 0:
             raise ValueError("Cannot calculate square root of negative number")
-        result = self.math.sqrt(number)
-        self.history.append(f"√{number} = {result}")
+        result = _sqrt(number)
+        if self._history_enabled:
+            self.history.append(f"√{number} = {result}")
         return result
@@ -2,11 +2,19 @@
 Logging utility module.
 """
 
+import functools
 import logging
 import sys
 from pathlib import Path
 
 
+# Shared by every handler this module creates
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
+@functools.lru_cache(maxsize=None)
 def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
     Setup and configure a logger.
@@ -16,7 +24,7 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
         level: Logging level (default: INFO)
         
     Returns:
-        Configured logger instance
+        Configured logger instance (memoized per (name, level))
     """
     logger = logging.getLogger(name)
     logger.setLevel(level)
@@ -29,11 +37,7 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
     
     logger.addHandler(console_handler)
     
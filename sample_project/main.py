@@ -35,13 +35,13 @@ def main():
         # Format and display result
         formatted = format_result(result)
         print(f"Result: {formatted}")
-        logger.info(f"Calculation completed: {num1} {operation} {num2} = {result}")
+        logger.info("Calculation completed: %s %s %s = %s", num1, operation, num2, result)
         
     except ValueError as e:
-        logger.error(f"Invalid input: {e}")
+        logger.error("Invalid input: %s", e)
         print(f"Error: {e}")
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         print(f"An error occurred: {e}")
 
 
@@ -44,6 +44,12 @@ class TestCalculator(unittest.TestCase):
         self.calc.subtract(5, 3)
         history = self.calc.get_history()
         self.assertEqual(len(history), 2)
+    
+    def test_history_disabled(self):
+        """Test that operations are not recorded when history is disabled."""
+        calc = Calculator(history_enabled=False)
+        calc.add(1, 2)
+        self.assertEqual(calc.get_history(), [])
 
 
 class TestScientificCalculator(unittest.TestCase):
@@ -0,0 +1,31 @@
+"""
+Unit tests for the formatting helpers.
+"""
+
+import unittest
+from utils.helpers import format_currency, format_result
+
+
+class TestFormatting(unittest.TestCase):
+    """Test cases for format_result and format_currency."""
+    
+    def test_format_result_float(self):
+        """Floats are rounded to the requested precision."""
+        self.assertEqual(format_result(3.14159), "3.14")
+        self.assertEqual(format_result(3.14159, precision=4), "3.1416")
+        self.assertEqual(format_result(2.5, precision=0), "2")
+    
+    def test_format_result_int(self):
+        """Integers and bools are printed as-is."""
+        self.assertEqual(format_result(42), "42")
+        self.assertEqual(format_result(True), "True")
+    
+    def test_format_currency(self):
+        """Known currencies get a symbol, others a suffix."""
+        self.assertEqual(format_currency(1234.5), "$1,234.50")
+        self.assertEqual(format_currency(1234.5, "EUR"), "€1,234.50")
+        self.assertEqual(format_currency(1234.5, "GBP"), "1,234.50 GBP")
+
+
+if __name__ == '__main__':
+    unittest.main()
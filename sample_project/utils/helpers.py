@@ -2,10 +2,22 @@
 Helper functions for formatting and input validation.
 """
 
+from functools import lru_cache
 from typing import Union
 from .validators import validate_number
 
 
+@lru_cache(maxsize=16)
+def _float_formatter(precision: int):
+    """Get a bound str.format for the given precision, parsed once per precision."""
+    return ("{:." + str(precision) + "f}").format
+
+
+_format_usd = "${:,.2f}".format
+_format_eur = "€{:,.2f}".format
+_format_amount = "{:,.2f}".format
+
+
 def format_result(value: Union[int, float], precision: int = 2) -> str:
     """
     Format a numeric result for display.
@@ -20,7 +32,7 @@ def format_result(value: Union[int, float], precision: int = 2) -> str:
     if isinstance(value, int):
         return str(value)
     elif isinstance(value, float):
-        return f"{value:.{precision}f}"
+        return _float_formatter(precision)(value)
     else:
         return str(value)
 
@@ -56,8 +68,8 @@ def format_currency(amount: float, currency: str = "USD") -> str:
         Formatted currency string
     """
     if currency == "USD":
-        return f"${amount:,.2f}"
+        return _format_usd(amount)
     elif currency == "EUR":
-        return f"€{amount:,.2f}"
+        return _format_eur(amount)
     else:
-        return f"{amount:,.2f} {currency}"
+        return _format_amount(amount) + " " + currency
@@ -15,8 +15,12 @@ def validate_number(value: Union[int, float]) -> None:
     Raises:
         TypeError: If value is not a number
     """
+    # Exact built-in types skip the isinstance MRO walk
+    value_type = type(value)
+    if value_type is int or value_type is float:
+        return
     if not isinstance(value, (int, float)):
-        raise TypeError(f"Expected number, got {type(value).__name__}")
+        raise TypeError(f"Expected number, got {value_type.__name__}")
 
 
 def validate_positive(value: Union[int, float]) -> None:
@@ -0,0 +1,37 @@
+"""
+Shared fixtures for the knowledge-base tests.
+"""
+
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from knowledge_base.vector_store import VectorStore, _SentenceTransformerEmbeddings
+
+
+class _HashingModel:
+    """Deterministic bag-of-words stand-in for a SentenceTransformer model."""
+    
+    dim = 8
+    
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+    
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms == 0, 1, norms)
+        return vectors
+
+
+def make_store(db_path: Path, index_type: str = "flat") -> VectorStore:
+    """Create a VectorStore whose embedding model is the hashing model."""
+    store = VectorStore(db_path=db_path, index_type=index_type)
+    store._embeddings = _HashingModel()
+    store._embedding_function = _SentenceTransformerEmbeddings(store._embeddings, 64)
+    return store
@@ -0,0 +1,119 @@
+"""
+Unit tests for the dependency graph and AST store models.
+"""
+
+import unittest
+
+from models.analysis_models import CodebaseAnalysis, DependencyGraphCSR
+from models.ast_models import ASTStore, ClassNode, FileASTInfo, FunctionNode, ImportNode
+
+
+# a -> b -> c -> a is a cycle, c -> d leaves it, e is isolated
+PATHS = ["a.py", "b.py", "c.py", "d.py", "e.py"]
+EDGES = [("a.py", "b.py"), ("b.py", "c.py"), ("c.py", "a.py"), ("c.py", "d.py")]
+
+
+class TestDependencyGraphCSR(unittest.TestCase):
+    """Test cases for DependencyGraphCSR."""
+    
+    def setUp(self):
+        """Build the small graph."""
+        self.graph = DependencyGraphCSR.from_edges(PATHS, EDGES)
+    
+    def test_from_edges(self):
+        """Ids follow path order and neighbours are sorted by id."""
+        self.assertEqual(self.graph.num_nodes, 5)
+        self.assertEqual(self.graph.path_to_id["d.py"], 3)
+        self.assertEqual(self.graph.indptr.tolist(), [0, 1, 2, 4, 4, 4])
+        self.assertEqual(self.graph.indices.tolist(), [1, 2, 0, 3])
+        self.assertEqual(self.graph.neighbor_paths("c.py"), ["a.py", "d.py"])
+    
+    def test_from_edges_without_edges(self):
+        """A graph of isolated nodes has no neighbours anywhere."""
+        graph = DependencyGraphCSR.from_edges(PATHS, [])
+        self.assertEqual(graph.indptr.tolist(), [0] * 6)
+        self.assertEqual(graph.neighbor_paths("a.py"), [])
+        self.assertEqual(graph.reachable("a.py"), set())
+    
+    def test_reversed(self):
+        """Every edge is flipped."""
+        reverse = self.graph.reversed()
+        self.assertEqual(reverse.neighbor_paths("a.py"), ["c.py"])
+        self.assertEqual(reverse.neighbor_paths("d.py"), ["c.py"])
+        self.assertEqual(reverse.neighbor_paths("e.py"), [])
+        self.assertEqual(
+            sorted((s, t) for t in PATHS for s in reverse.neighbor_paths(t)),
+            sorted(EDGES),
+        )
+    
+    def test_reachable_through_cycle(self):
+        """Traversal terminates on cycles and excludes the start node."""
+        self.assertEqual(self.graph.reachable("a.py"), {"b.py", "c.py", "d.py"})
+        self.assertEqual(self.graph.reachable("d.py"), set())
+    
+    def test_reachable_isolated_and_unknown(self):
+        """Isolated and unknown files reach nothing."""
+        self.assertEqual(self.graph.reachable("e.py"), set())
+        self.assertEqual(self.graph.reachable("missing.py"), set())
+        self.assertEqual(self.graph.neighbor_paths("missing.py"), [])
+
+
+class TestCodebaseAnalysis(unittest.TestCase):
+    """Test cases for the graph queries on CodebaseAnalysis."""
+    
+    def test_get_transitive_dependents(self):
+        """Dependents of dependents are included."""
+        graph = DependencyGraphCSR.from_edges(PATHS, EDGES)
+        analysis = CodebaseAnalysis(
+            dependency_csr=graph, reverse_dependency_csr=graph.reversed()
+        )
+        self.assertEqual(analysis.get_transitive_dependents("d.py"), {"a.py", "b.py", "c.py"})
+        self.assertEqual(analysis.get_transitive_dependents("e.py"), set())
+        self.assertEqual(analysis.get_dependents("a.py"), ["c.py"])
+    
+    def test_get_transitive_dependents_without_csr(self):
+        """Without CSR arrays the dict graph gives the same answers."""
+        reverse_graph = {}
+        for source, target in EDGES:
+            reverse_graph.setdefault(target, set()).add(source)
+        analysis = CodebaseAnalysis(reverse_dependency_graph=reverse_graph)
+        self.assertIsNone(analysis.reverse_dependency_csr)
+        
+        graph = DependencyGraphCSR.from_edges(PATHS, EDGES).reversed()
+        for path in PATHS + ["missing.py"]:
+            self.assertEqual(analysis.get_transitive_dependents(path), graph.reachable(path))
+        self.assertEqual(analysis.get_transitive_dependents("d.py"), {"a.py", "b.py", "c.py"})
+    
+    def test_get_transitive_dependents_without_graph(self):
+        """An analysis without a graph has no dependents."""
+        self.assertEqual(CodebaseAnalysis().get_transitive_dependents("a.py"), set())
+
+
+class TestASTStore(unittest.TestCase):
+    """Test cases for ASTStore."""
+    
+    def test_from_files(self):
+        """Node columns stay parallel to their file id columns."""
+        first = FileASTInfo(
+            file_path="a.py",
+            functions=[FunctionNode("f", 1, 2), FunctionNode("g", 3, 4)],
+            imports=[ImportNode("os")],
+        )
+        empty = FileASTInfo(file_path="b.py")
+        second = FileASTInfo(
+            file_path="c.py",
+            classes=[ClassNode("C", 1, 5)],
+            imports=[ImportNode("sys"), ImportNode("json")],
+        )
+        store = ASTStore.from_files({"a.py": first, "b.py": empty, "c.py": second})
+        
+        self.assertEqual(store.files, ["a.py", "b.py", "c.py"])
+        self.assertEqual([f.name for f in store.functions], ["f", "g"])
+        self.assertEqual(store.function_file, [0, 0])
+        self.assertEqual(store.class_file, [2])
+        self.assertEqual([i.module for i in store.imports], ["os", "sys", "json"])
+        self.assertEqual(store.import_file, [0, 2, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Unit tests for parsing in the file scanner.
+"""
+
+import pickle
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tools.ast_cache import ASTCache
+from tools.file_scanner import FileScanner
+
+
+class TestParseFile(unittest.TestCase):
+    """Test cases for FileScanner.parse_file."""
+    
+    def setUp(self):
+        """Create a scratch directory and a scanner over it."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.scanner = FileScanner(str(self.root))
+    
+    def _parse(self, source: str):
+        path = self.root / "module.py"
+        path.write_text(source)
+        return self.scanner.parse_file(path)
+    
+    def test_syntax_error_without_definitions(self):
+        """Syntax errors are reported even when no def/class/import/= appears."""
+        self.assertIn("SyntaxError", self._parse("x +\n").parse_error)
+        self.assertIn("SyntaxError", self._parse('"""Docstring."""\n)\n').parse_error)
+    
+    def test_comment_only_file(self):
+        """Blank and comment-only files parse cleanly to nothing."""
+        for source in ("", "\n\n", "# just a comment\n"):
+            ast_info = self._parse(source)
+            self.assertIsNone(ast_info.parse_error)
+            self.assertEqual(ast_info.code_lines, 0)
+            self.assertEqual(ast_info.functions, [])
+    
+    def test_extracts_definitions(self):
+        """Functions, classes and imports are extracted."""
+        ast_info = self._parse("import os\n\nclass A:\n    def f(self):\n        pass\n")
+        self.assertIsNone(ast_info.parse_error)
+        self.assertEqual([i.module for i in ast_info.imports], ["os"])
+        self.assertEqual([c.name for c in ast_info.classes], ["A"])
+        self.assertEqual(ast_info.code_lines, 4)
+
+
+
+class TestInterning(unittest.TestCase):
+    """Test cases for re-interning unpickled parse results."""
+    
+    SOURCE = "import os\n\nclass A:\n    def f(self):\n        pass\n"
+    
+    def setUp(self):
+        """Create a scratch directory with one module and a scanner over it."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.path = self.root / "module.py"
+        self.path.write_text(self.SOURCE)
+        self.scanner = FileScanner(str(self.root))
+    
+    def _assert_interned(self, ast_info):
+        self.assertIs(ast_info.file_path, sys.intern(str(self.path)))
+        self.assertIs(ast_info.imports[0].module, sys.intern("os"))
+        self.assertIs(ast_info.classes[0].name, sys.intern("A"))
+        method = ast_info.classes[0].methods[0]
+        self.assertIs(method.name, sys.intern("f"))
+        self.assertIs(method.parent_class, sys.intern("A"))
+    
+    def test_intern_strings_after_pickle(self):
+        """A pickle round trip skips __post_init__; intern_strings restores it."""
+        ast_info = self.scanner.parse_file(self.path)
+        restored = pickle.loads(pickle.dumps(ast_info))
+        self.assertIsNot(restored.file_path, ast_info.file_path)
+        self._assert_interned(restored.intern_strings())
+    
+    def test_cache_hits_are_interned(self):
+        """Results served from the AST cache share the interned strings."""
+        cache = ASTCache(self.root / "ast_cache")
+        self.addCleanup(cache.close)
+        with mock.patch("tools.file_scanner.get_ast_cache", return_value=cache):
+            self.scanner.parse_files([self.path], workers=1)
+            (ast_info,) = self.scanner.parse_files([self.path], workers=1)
+        self._assert_interned(ast_info)
+
+
+if __name__ == '__main__':
+    unittest.main()
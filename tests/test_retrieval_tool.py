@@ -0,0 +1,267 @@
+"""
+Unit tests for incremental knowledge-base builds in the retrieval tool.
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from config.settings import settings
+
+try:
+    import faiss  # noqa: F401
+    from helpers import make_store
+    from tools import retrieval_tool
+    from tools.retrieval_tool import RetrievalTool
+    from tools import file_scanner
+    from tools.file_scanner import FileScanner
+    from tools.code_analyzer import CodeAnalyzer
+except ImportError:  # faiss / langchain not installed
+    retrieval_tool = None
+
+SAMPLE_PROJECT = Path(__file__).resolve().parent.parent / "sample_project"
+
+
+@unittest.skipIf(retrieval_tool is None, "faiss and langchain are required")
+class TestIncrementalBuild(unittest.TestCase):
+    """Rebuilds re-embed only the files whose documents changed."""
+    
+    def setUp(self):
+        """Copy the sample project and create an empty store."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.project = Path(self._tmp.name) / "project"
+        shutil.copytree(SAMPLE_PROJECT, self.project,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        
+        patcher = mock.patch.object(settings, "AST_CACHE_ENABLED", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.tool = RetrievalTool(make_store(Path(self._tmp.name) / "db"))
+    
+    def _build(self):
+        files = FileScanner(str(self.project)).scan_all_files(parallel=False)
+        analysis = CodeAnalyzer(files).analyze().data["analysis"]
+        response = self.tool.build_knowledge_base(files, analysis)
+        self.assertTrue(response.success, response.error)
+        return response.data
+    
+    def _stored_documents(self):
+        return list(self.tool.vector_store._store.docstore._dict.values())
+    
+    def _stored_files(self):
+        return {Path(doc.metadata["file_path"]).name for doc in self._stored_documents()}
+    
+    def test_rebuild_sequence(self):
+        """Build, no-op rebuild, edit-one-file rebuild, delete-file rebuild."""
+        first = self._build()
+        self.assertGreater(first["num_documents"], 0)
+        self.assertEqual(first["num_unchanged_files"], 0)
+        size = self.tool.vector_store.size
+        
+        # Nothing changed: nothing is re-embedded
+        second = self._build()
+        self.assertEqual(second["num_documents"], 0)
+        self.assertEqual(self.tool.vector_store.size, size)
+        
+        # Editing one file re-embeds only that file
+        calculator = self.project / "calculator.py"
+        calculator.write_text(
+            calculator.read_text() + "\n\ndef brand_new_helper(x):\n    return x\n"
+        )
+        third = self._build()
+        self.assertEqual(third["num_unchanged_files"], second["num_unchanged_files"] - 1)
+        self.assertGreater(third["num_documents"], 0)
+        self.assertLess(third["num_documents"], first["num_documents"])
+        self.assertTrue(any(
+            doc.metadata.get("function_name") == "brand_new_helper"
+            for doc in self._stored_documents()
+        ))
+        
+        # Deleting a file evicts its documents
+        self.assertIn("logger.py", self._stored_files())
+        (self.project / "logger.py").unlink()
+        self._build()
+        self.assertNotIn("logger.py", self._stored_files())
+    
+    def test_isolated_file_has_no_dependency_document(self):
+        """A file with no imports and no importers gets no dependency document."""
+        (self.project / "isolated.py").write_text("def lonely():\n    return 1\n")
+        self._build()
+        
+        dependency_files = {
+            Path(doc.metadata["file_path"]).name
+            for doc in self._stored_documents()
+            if doc.metadata["type"] == "dependencies"
+        }
+        self.assertIn("calculator.py", dependency_files)
+        self.assertNotIn("isolated.py", dependency_files)
+        self.assertIn("isolated.py", self._stored_files())
+    
+    def test_parallel_documents_use_shared_pool(self):
+        """The process-pool path builds the same documents on one reused pool."""
+        files = FileScanner(str(self.project)).scan_all_files(parallel=False)
+        serial = list(self.tool._iter_documents(files, None))
+        
+        pools = []
+        
+        def get_worker_pool(workers):
+            pools.append(file_scanner.get_worker_pool(workers))
+            return pools[-1]
+        
+        with mock.patch.object(retrieval_tool, "PARALLEL_DOCUMENT_MIN_FILES", 0), \
+                mock.patch.object(retrieval_tool.os, "cpu_count", return_value=2), \
+                mock.patch.object(retrieval_tool, "get_worker_pool", get_worker_pool):
+            self.assertEqual(list(self.tool._iter_documents(files, None)), serial)
+            self.assertEqual(list(self.tool._iter_documents(files, None)), serial)
+        
+        self.assertEqual(len(pools), 2)
+        self.assertIs(pools[0], pools[1])
+    
+    def test_format_version_change_rebuilds_everything(self):
+        """Bumping DOC_FORMAT_VERSION re-embeds every file."""
+        first = self._build()
+        with mock.patch.object(retrieval_tool, "DOC_FORMAT_VERSION",
+                               retrieval_tool.DOC_FORMAT_VERSION + 1):
+            rebuilt = self._build()
+        self.assertEqual(rebuilt["num_unchanged_files"], 0)
+        self.assertEqual(rebuilt["num_documents"], first["num_documents"])
+
+
+
+@unittest.skipIf(retrieval_tool is None, "faiss and langchain are required")
+class TestRetrieve(unittest.TestCase):
+    """Retrieval from a built knowledge base."""
+    
+    def setUp(self):
+        """Build a knowledge base from the sample project."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        
+        patcher = mock.patch.object(settings, "AST_CACHE_ENABLED", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        files = FileScanner(str(SAMPLE_PROJECT)).scan_all_files(parallel=False)
+        analysis = CodeAnalyzer(files).analyze().data["analysis"]
+        self.tool = RetrievalTool(make_store(Path(self._tmp.name)))
+        self.assertTrue(self.tool.build_knowledge_base(files, analysis).success)
+    
+    def test_cached_results_are_not_shared(self):
+        """Mutating a returned result does not change later results."""
+        first = self.tool.retrieve("calculator add", top_k=3).data["context"]
+        expected = [dict(result, metadata=dict(result["metadata"])) for result in first]
+        first[0]["content"] = "changed"
+        first[0]["metadata"]["file_path"] = "changed.py"
+        first.clear()
+        
+        second = self.tool.retrieve("calculator add", top_k=3).data["context"]
+        self.assertEqual(second, expected)
+    
+    def test_batch_duplicates_are_not_shared(self):
+        """Repeated queries in one batch get independent results."""
+        first, second = self.tool.retrieve_batch(["calculator add", "calculator add"])
+        expected = [
+            dict(result, metadata=dict(result["metadata"])) for result in second.data["context"]
+        ]
+        first.data["context"][0]["content"] = "changed"
+        first.data["context"][0]["metadata"]["file_path"] = "changed.py"
+        self.assertEqual(second.data["context"], expected)
+    
+    def test_only_blank_queries_are_rejected(self):
+        """Whitespace-only queries are rejected, one-character queries are searched."""
+        self.assertEqual(self.tool.retrieve("  \n").error, "EmptyQuery")
+        self.assertTrue(self.tool.retrieve("x").success)
+        
+        responses = self.tool.retrieve_batch(["", "x", " x "])
+        self.assertEqual(responses[0].error, "EmptyQuery")
+        self.assertTrue(responses[1].success and responses[2].success)
+
+
+
+class _FakeRedis:
+    """In-memory stand-in for the redis client calls the retrieval tool makes."""
+    
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.gets = []
+    
+    def get(self, key):
+        self.gets.append(key)
+        return self.data.get(key)
+    
+    def setex(self, key, ttl, value):
+        self.ttls[key] = ttl
+        self.data[key] = value.encode("utf-8")
+    
+    def set(self, key, value):
+        self.ttls[key] = None
+        self.data[key] = value.encode("utf-8")
+    
+    def incr(self, key):
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value).encode("utf-8")
+        return value
+
+
+@unittest.skipIf(retrieval_tool is None, "faiss and langchain are required")
+class TestSharedCache(unittest.TestCase):
+    """Result caching in front of a shared Redis cache."""
+    
+    def setUp(self):
+        """Build a knowledge base from the sample project with a shared cache."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        
+        patcher = mock.patch.object(settings, "AST_CACHE_ENABLED", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.files = FileScanner(str(SAMPLE_PROJECT)).scan_all_files(parallel=False)
+        self.analysis = CodeAnalyzer(self.files).analyze().data["analysis"]
+        self.redis = _FakeRedis()
+        self.db_path = Path(self._tmp.name)
+        self.builder = RetrievalTool(make_store(self.db_path), redis_client=self.redis)
+        self.assertTrue(self.builder.build_knowledge_base(self.files, self.analysis).success)
+    
+    def test_version_read_once_per_ttl(self):
+        """Local misses do not each re-read the shared version."""
+        tool = RetrievalTool(make_store(self.db_path), redis_client=self.redis)
+        for query in ("calculator add", "logger setup", "validate number"):
+            self.assertTrue(tool.retrieve(query).success)
+        self.assertEqual(self.redis.gets.count(retrieval_tool.REDIS_VERSION_KEY), 1)
+    
+    def test_cache_ttl(self):
+        """cache_ttl=0 stores entries without expiry instead of using the default."""
+        tool = RetrievalTool(make_store(self.db_path), redis_client=self.redis, cache_ttl=0)
+        self.assertEqual(tool.cache_ttl, 0)
+        tool.retrieve("calculator add")
+        self.assertEqual(list(self.redis.ttls.values()), [None])
+        
+        tool = RetrievalTool(make_store(self.db_path), redis_client=self.redis)
+        self.assertEqual(tool.cache_ttl, settings.RETRIEVAL_CACHE_TTL)
+        tool.retrieve("logger setup")
+        self.assertIn(settings.RETRIEVAL_CACHE_TTL, self.redis.ttls.values())
+    
+    def test_rebuild_elsewhere_invalidates_local_cache(self):
+        """A rebuild in another process is seen once the version TTL lapses."""
+        tool = RetrievalTool(make_store(self.db_path), redis_client=self.redis)
+        with mock.patch.object(retrieval_tool, "REDIS_VERSION_TTL", 0.0):
+            tool.retrieve("calculator add")
+            tool.retrieve("calculator add")
+            self.assertEqual(len(self.redis.data), 2)  # version + one result
+            
+            # The other tool's rebuild bumps the shared version, so the next
+            # lookup misses the local cache and stores a result for it
+            self.builder.build_knowledge_base(self.files, self.analysis)
+            tool.retrieve("calculator add")
+            self.assertEqual(self.redis.data[retrieval_tool.REDIS_VERSION_KEY], b"2")
+            self.assertEqual(len(self.redis.data), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""
+Unit tests for the FAISS vector store.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import faiss  # noqa: F401
+    from knowledge_base import vector_store
+    from helpers import make_store
+except ImportError:  # faiss / langchain not installed
+    vector_store = None
+
+
+def make_documents(start: int, count: int):
+    """Create distinct documents numbered start..start+count-1."""
+    return [
+        {
+            "content": f"document {i} word{i % 97} term{i % 13} token{i % 7}",
+            "metadata": {"file_path": f"file_{i % 10}.py", "n": i},
+        }
+        for i in range(start, start + count)
+    ]
+
+
+@unittest.skipIf(vector_store is None, "faiss and langchain are required")
+class TestVectorStoreReload(unittest.TestCase):
+    """Reloading a persisted store and adding to it, for every index type."""
+    
+    def setUp(self):
+        """Use a temporary store directory and a small ANN threshold."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmp.name)
+        # Small enough that 400 documents get a real ANN / IVF-PQ index
+        patcher = mock.patch.object(vector_store, "FAISS_MIN_ANN_VECTORS", 300)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+    
+    def _reload_then_add(self, index_type):
+        store = make_store(self.db_path, index_type)
+        store.add_documents(make_documents(0, 400))
+        self.assertEqual(store.size, 400)
+        
+        reloaded = make_store(self.db_path, index_type)
+        self.assertTrue(reloaded.has_persisted_index())
+        self.assertFalse(reloaded.is_initialized())
+        
+        # Searching loads the index read-only; adding reloads it writable
+        self.assertTrue(reloaded.search("document 5 word5 term5 token5", top_k=5))
+        self.assertEqual(reloaded.size, 400)
+        
+        reloaded.add_documents(make_documents(400, 20))
+        self.assertEqual(reloaded.size, 420)
+        
+        results = reloaded.search("document 410 word22 term7 token4", top_k=5)
+        self.assertTrue(results)
+        
+        # The added documents were persisted too
+        persisted = make_store(self.db_path, index_type)
+        self.assertTrue(persisted.load())
+        self.assertEqual(persisted.size, 420)
+    
+    def test_is_initialized_does_not_load(self):
+        """is_initialized is a pure check; load reads the persisted store."""
+        make_store(self.db_path, "flat").add_documents(make_documents(0, 10))
+        
+        store = make_store(self.db_path, "flat")
+        self.assertFalse(store.is_initialized())
+        self.assertIsNone(store._store)
+        self.assertTrue(store.load(read_only=True))
+        self.assertTrue(store.is_initialized())
+        self.assertEqual(store.size, 10)
+    
+    def test_reload_then_add_flat(self):
+        """Flat index accepts additions after a reload."""
+        self._reload_then_add("flat")
+    
+    def test_reload_then_add_sq8(self):
+        """Scalar-quantized index accepts additions after a reload."""
+        self._reload_then_add("sq8")
+    
+    def test_reload_then_add_hnsw(self):
+        """HNSW index accepts additions after a reload."""
+        self._reload_then_add("hnsw")
+    
+    def test_reload_then_add_hnsw_sq8(self):
+        """Quantized HNSW index accepts additions after a reload."""
+        self._reload_then_add("hnsw_sq8")
+    
+    def test_reload_then_add_ivfpq(self):
+        """IVF-PQ index accepts additions after a reload."""
+        self._reload_then_add("ivfpq")
+
+
+
+@unittest.skipIf(vector_store is None, "faiss and langchain are required")
+class TestVectorStoreDuplicates(unittest.TestCase):
+    """Identical texts share one vector but keep every file's metadata."""
+    
+    def setUp(self):
+        """Store one shared text from two files plus one unique text."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.db_path = Path(self._tmp.name)
+        self.store = make_store(self.db_path)
+        self.store.add_documents([
+            {"content": "license header", "metadata": {"file_path": "a.py"}},
+            {"content": "license header", "metadata": {"file_path": "b.py"}},
+            {"content": "def unique(): pass", "metadata": {"file_path": "a.py"}},
+        ])
+    
+    def _metadata_for(self, text):
+        return [
+            doc.metadata for doc in self.store._store.docstore._dict.values()
+            if doc.page_content == text
+        ]
+    
+    def test_duplicate_shares_vector(self):
+        """The duplicate is not embedded again but its metadata is kept."""
+        self.assertEqual(self.store.size, 2)
+        self.assertEqual(
+            self._metadata_for("license header"),
+            [{"file_path": "a.py", "duplicates": [{"file_path": "b.py"}]}],
+        )
+    
+    def test_delete_canonical_keeps_duplicate(self):
+        """Deleting the first file hands the shared document to the other."""
+        self.assertEqual(self.store.delete_by_metadata("file_path", ["a.py"]), 2)
+        self.assertEqual(self.store.size, 1)
+        self.assertEqual(self._metadata_for("license header"), [{"file_path": "b.py"}])
+        
+        # Persisted too
+        reloaded = make_store(self.db_path)
+        self.assertTrue(reloaded.load())
+        self.assertEqual(reloaded.size, 1)
+    
+    def test_delete_duplicate_keeps_canonical(self):
+        """Deleting the second file only drops it from the duplicates."""
+        self.assertEqual(self.store.delete_by_metadata("file_path", ["b.py"]), 1)
+        self.assertEqual(self.store.size, 2)
+        self.assertEqual(self._metadata_for("license header"), [{"file_path": "a.py"}])
+    
+    def test_delete_then_re_add(self):
+        """Text deleted from every file is embedded again when re-added."""
+        self.store.delete_by_metadata("file_path", ["a.py", "b.py"])
+        self.assertEqual(self.store.size, 0)
+        
+        self.store.add_documents([
+            {"content": "license header", "metadata": {"file_path": "c.py"}},
+        ])
+        self.assertEqual(self.store.size, 1)
+        self.assertEqual(self._metadata_for("license header"), [{"file_path": "c.py"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Persistent cache of parsed files, keyed by path and validated by stat."""
+
+import atexit
+import os
+import pickle
+import shelve
+import threading
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from models.ast_models import FileASTInfo
+from config.settings import settings
+
+
+# Bump whenever parse_file output changes so stale entries are re-parsed
+CACHE_FORMAT_VERSION = 7
+
+
+class ASTCache:
+    """
+    On-disk memo of FileASTInfo objects.
+
+    Entries are keyed by absolute path and store (version, mtime_ns, size, info),
+    so a re-scan only parses files whose stat signature changed.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """
+        Open (or create) the cache.
+
+        Args:
+            cache_dir: Directory holding the shelve files
+
+        Raises:
+            BlockingIOError: If another process already has the cache open
+        """
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # dbm files are not safe for concurrent writers; hold an exclusive
+        # lock for as long as the shelf is open
+        self._lock_file = open(cache_dir / "ast_cache.lock", "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_file.close()
+                raise BlockingIOError(f"AST cache in use by another process: {cache_dir}")
+
+        self._shelf = shelve.open(
+            str(cache_dir / "ast_cache"), protocol=pickle.HIGHEST_PROTOCOL
+        )
+        self._lock = threading.Lock()
+
+    def get(self, file_path: Path, stat: os.stat_result) -> Optional[FileASTInfo]:
+        """
+        Look up a file's parsed info.
+
+        Args:
+            file_path: Path of the file
+            stat: Current stat of the file
+
+        Returns:
+            Cached FileASTInfo, or None if missing or stale
+        """
+        with self._lock:
+            try:
+                entry = self._shelf.get(str(file_path))
+            except Exception:
+                # Unreadable entry (e.g. pickled by an incompatible version)
+                return None
+
+        if entry is None:
+            return None
+
+        version, mtime_ns, size, info = entry
+        if (version, mtime_ns, size) != (CACHE_FORMAT_VERSION, stat.st_mtime_ns, stat.st_size):
+            return None
+        return info
+
+    def put(self, file_path: Path, stat: os.stat_result, info: FileASTInfo):
+        """Store a file's parsed info along with the stat it was parsed at."""
+        with self._lock:
+            self._shelf[str(file_path)] = (
+                CACHE_FORMAT_VERSION, stat.st_mtime_ns, stat.st_size, info
+            )
+
+    def close(self):
+        """Drop entries for files that no longer exist and flush to disk."""
+        with self._lock:
+            for key in [key for key in self._shelf.keys() if not os.path.exists(key)]:
+                del self._shelf[key]
+            self._shelf.close()
+            # Closing the file releases the lock
+            self._lock_file.close()
+
+
+_cache: Optional[ASTCache] = None
+_cache_unavailable = False
+_cache_lock = threading.Lock()
+
+
+def get_ast_cache() -> Optional[ASTCache]:
+    """
+    Get the process-wide AST cache, opening it on first use.
+
+    Returns:
+        ASTCache, or None if disabled via settings.AST_CACHE_ENABLED or
+        held by another process
+    """
+    global _cache, _cache_unavailable
+
+    if not settings.AST_CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None and not _cache_unavailable:
+            # A shelf may only be opened once per process, so share one handle
+            try:
+                _cache = ASTCache(settings.AST_CACHE_PATH)
+            except BlockingIOError:
+                # Another scan owns the cache; parse without it
+                _cache_unavailable = True
+                return None
+            atexit.register(_cache.close)
+        return _cache
@@ -1,12 +1,18 @@
 """Code analyzer tool for dependency analysis and risk scoring."""
 
-from typing import Dict, List, Set, Optional
+import functools
+import heapq
+import sys
+from typing import Dict, FrozenSet, List, Set, Optional, Tuple
 from pathlib import Path
 from collections import defaultdict
 
-from models.ast_models import FileASTInfo, ImportNode
+import numpy as np
+
+from models.ast_models import FileASTInfo, ImportNode, ASTStore
 from models.analysis_models import (
     CodebaseAnalysis,
+    DependencyGraphCSR,
     FileAnalysis,
     FileDependency,
     DependencyType,
@@ -15,6 +21,30 @@ from models.analysis_models import (
 from models.agent_models import ToolResponse
 
 
+# Order of the columns in the per-file risk factor matrix
+RISK_FACTORS = ("complexity", "dependencies", "dependents", "size", "test_coverage")
+
+# Messages for the leading RISK_FACTORS columns that exceed the threshold
+RISK_EXPLANATIONS = (
+    "High complexity",
+    "Many dependencies",
+    "Many files depend on this",
+    "Large file size",
+)
+RISK_EXPLANATION_THRESHOLD = 0.7
+
+# Explanation for every combination of exceeded factors, indexed by bitmask
+_EXPLANATION_TABLE = tuple(
+    "; ".join(
+        message for bit, message in enumerate(RISK_EXPLANATIONS) if mask >> bit & 1
+    ) or "Low to medium risk"
+    for mask in range(1 << len(RISK_EXPLANATIONS))
+)
+
+# Shared placeholder for usage maps that are not populated yet
+_NO_USAGE: FrozenSet[str] = frozenset()
+
+
 class CodeAnalyzer:
     """Analyzes codebase structure, dependencies, and risks."""
     
@@ -25,30 +55,58 @@ class CodeAnalyzer:
         Args:
             scanned_files: Dictionary of file paths to FileASTInfo objects
         """
-        self.scanned_files = scanned_files
-        self.root_paths: Set[Path] = set()
-        
-        # Build root paths set for module resolution
-        for file_path in scanned_files.keys():
-            path = Path(file_path)
-            # Add all parent directories as potential roots
-            for parent in path.parents:
-                self.root_paths.add(parent)
-            self.root_paths.add(path.parent)
+        # Share one string object per path across the graphs, dependencies
+        # and file analyses built from these keys
+        self.scanned_files = {
+            sys.intern(file_path): ast_info
+            for file_path, ast_info in scanned_files.items()
+        }
+        self.ast_store = ASTStore.from_files(self.scanned_files)
+        
+        # Build root paths set for module resolution: every ancestor
+        # directory (parents includes the direct parent) is a potential root
+        self.root_paths: Set[Path] = {
+            parent
+            for file_path in self.scanned_files
+            for parent in Path(file_path).parents
+        }
+        
+        # Absolute imports resolve through one dict lookup instead of a
+        # scan over every scanned file and root
+        self._module_index = self._build_module_index()
+        
+        # Relative imports touch the filesystem; resolve each distinct
+        # (module, importing directory) only once per analyzer
+        self._resolve_relative = functools.lru_cache(maxsize=None)(
+            self._resolve_relative_uncached
+        )
     
-    def analyze(self) -> ToolResponse:
+    def analyze(self, top_k: Optional[int] = None) -> ToolResponse:
         """
         Perform full codebase analysis.
         
+        Args:
+            top_k: Only rank this many most risky/impactful files (default: all)
+        
         Returns:
             ToolResponse with CodebaseAnalysis object
         """
         try:
             analysis = CodebaseAnalysis()
             
+            # Resolve every import in the codebase in one pass over the store
+            dependencies_by_file = self._find_all_dependencies()
+            
+            # Complexity metrics for all files at once
+            complexity_by_file = self._calculate_all_complexity()
+            
             # Build file analysis for each file
-            for file_path, ast_info in self.scanned_files.items():
-                file_analysis = self._analyze_file(file_path, ast_info)
+            for (file_path, ast_info), complexity_metrics in zip(
+                self.scanned_files.items(), complexity_by_file
+            ):
+                file_analysis = self._analyze_file(
+                    file_path, ast_info, dependencies_by_file[file_path], complexity_metrics
+                )
                 analysis.files[file_path] = file_analysis
             
             # Build dependency graphs
@@ -57,19 +115,19 @@ class CodeAnalyzer:
             # Calculate risk scores
             self._calculate_risk_scores(analysis)
             
-            # Sort files by risk and impact
-            analysis.most_risky_files = sorted(
-                analysis.files.keys(),
-                key=lambda f: analysis.files[f].risk_score.overall_score
-                if analysis.files[f].risk_score
-                else 0.0,
-                reverse=True,
-            )
-            analysis.most_impactful_files = sorted(
-                analysis.files.keys(),
-                key=lambda f: analysis.files[f].get_impact_score(),
-                reverse=True,
-            )
+            # Sort files by risk and impact, computing each key once
+            risk_scores = {
+                file_path: file_analysis.risk_score.overall_score
+                if file_analysis.risk_score
+                else 0.0
+                for file_path, file_analysis in analysis.files.items()
+            }
+            impact_scores = {
+                file_path: file_analysis.get_impact_score()
+                for file_path, file_analysis in analysis.files.items()
+            }
+            analysis.most_risky_files = self._rank(risk_scores, top_k)
+            analysis.most_impactful_files = self._rank(impact_scores, top_k)
             
             analysis.total_files = len(analysis.files)
             analysis.total_lines = sum(
@@ -89,16 +147,29 @@ class CodeAnalyzer:
                 error=str(e),
             )
     
-    def _analyze_file(self, file_path: str, ast_info: FileASTInfo) -> FileAnalysis:
+    @staticmethod
+    def _rank(scores: Dict[str, float], top_k: Optional[int]) -> List[str]:
+        """Order paths by descending score, keeping ties in insertion order."""
+        if top_k is not None and top_k < len(scores):
+            # O(F log K) partial selection; same order as sorted(...)[:top_k]
+            return heapq.nlargest(top_k, scores, key=scores.__getitem__)
+        return sorted(scores, key=scores.__getitem__, reverse=True)
+    
+    def _analyze_file(
+        self,
+        file_path: str,
+        ast_info: FileASTInfo,
+        dependencies: List[FileDependency],
+        complexity_metrics: Dict[str, float],
+    ) -> FileAnalysis:
         """Analyze a single file."""
         analysis = FileAnalysis(file_path=file_path)
         
-        # Find dependencies (files this file imports)
-        dependencies = self._find_file_dependencies(file_path, ast_info)
+        # Dependencies (files this file imports)
         analysis.dependencies = dependencies
         
-        # Calculate complexity metrics
-        analysis.complexity_metrics = self._calculate_complexity(ast_info)
+        # Complexity metrics (computed for all files up front)
+        analysis.complexity_metrics = complexity_metrics
         
         # Build function and class usage maps
         analysis.function_usage = self._map_function_usage(file_path, ast_info)
@@ -106,16 +177,26 @@ class CodeAnalyzer:
         
         return analysis
     
-    def _find_file_dependencies(
-        self, file_path: str, ast_info: FileASTInfo
-    ) -> List[FileDependency]:
-        """Find all file dependencies for a given file."""
-        dependencies = []
-        source_path = Path(file_path)
+    def _find_all_dependencies(self) -> Dict[str, List[FileDependency]]:
+        """
+        Find file dependencies for every scanned file.
+        
+        Returns:
+            Dictionary mapping each file path to the files it imports
+        """
+        store = self.ast_store
+        dependencies_by_file: Dict[str, List[FileDependency]] = {
+            file_path: [] for file_path in store.files
+        }
+        source_paths = [Path(file_path) for file_path in store.files]
         
-        for import_node in ast_info.imports:
+        # A single walk over the flat import column instead of a nested
+        # loop over files and their per-file import lists
+        for import_node, file_id in zip(store.imports, store.import_file):
+            file_path = store.files[file_id]
+            
             # Try to resolve import to a file
-            target_files = self._resolve_import_to_files(import_node, source_path)
+            target_files = self._resolve_import_to_files(import_node, source_paths[file_id])
             
             for target_file in target_files:
                 if target_file != file_path:  # Skip self-references
@@ -123,218 +204,243 @@ class CodeAnalyzer:
                         source_file=file_path,
                         target_file=target_file,
                         dependency_type=DependencyType.IMPORT,
-                        details={
-                            "module": import_node.module,
-                            "imported_items": import_node.imported_items,
-                            "import_type": import_node.import_type,
-                        },
+                        module=import_node.module,
+                        imported_items=import_node.imported_items,
+                        import_type=import_node.import_type,
                         strength=1.0 if import_node.import_type == "from_import" else 0.8,
                     )
-                    dependencies.append(dep)
+                    dependencies_by_file[file_path].append(dep)
         
-        return dependencies
+        return dependencies_by_file
     
     def _resolve_import_to_files(
         self, import_node: ImportNode, source_path: Path
-    ) -> List[str]:
+    ) -> Tuple[str, ...]:
         """Resolve an import statement to actual file paths."""
-        target_files = []
-        
         # Get module path
         module = import_node.module
         if not module:
-            return []
+            return ()
         
         # Handle relative imports
         if module.startswith("."):
             # Relative import - resolve relative to source file's directory
-            parts = module.split(".")
-            level = sum(1 for p in parts if not p)
-            module_parts = [p for p in parts if p]
-            
-            base_dir = source_path.parent
-            for _ in range(level):
-                base_dir = base_dir.parent
-            
-            potential_path = base_dir / "/".join(module_parts)
-            if potential_path.with_suffix(".py").exists():
-                target_files.append(str(potential_path.with_suffix(".py")))
-            elif potential_path.is_dir() and (potential_path / "__init__.py").exists():
-                target_files.append(str(potential_path / "__init__.py"))
-        else:
-            # Absolute import - try to resolve
-            module_parts = module.split(".")
+            return self._resolve_relative(module, source_path.parent)
+        
+        # Absolute import - the result does not depend on the importing file
+        return self._resolve_absolute(module)
+    
+    def _resolve_relative_uncached(self, module: str, source_dir: Path) -> Tuple[str, ...]:
+        """Resolve a relative module against the importing file's directory."""
+        parts = module.split(".")
+        level = sum(1 for p in parts if not p)
+        module_parts = [p for p in parts if p]
+        
+        base_dir = source_dir
+        for _ in range(level):
+            base_dir = base_dir.parent
+        
+        potential_path = base_dir / "/".join(module_parts)
+        if potential_path.with_suffix(".py").exists():
+            return (sys.intern(str(potential_path.with_suffix(".py"))),)
+        elif potential_path.is_dir() and (potential_path / "__init__.py").exists():
+            return (sys.intern(str(potential_path / "__init__.py")),)
+        return ()
+    
+    def _resolve_absolute(self, module: str) -> Tuple[str, ...]:
+        """Resolve an absolute module to the scanned files it names."""
+        return self._module_index.get(tuple(module.split(".")), ())
+    
+    def _build_module_index(self) -> Dict[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Map every dotted module name a scanned file could be imported as to its path.
+        
+        A file is importable relative to each of its ancestor directories
+        (pkg/mod.py is both "pkg.mod" and "mod"); packages map to their
+        __init__.py.
+        
+        Returns:
+            Dictionary mapping module parts to scanned paths, in scan order
+        """
+        index: Dict[Tuple[str, ...], List[str]] = defaultdict(list)
+        
+        for scanned_path in self.scanned_files.keys():
+            scanned_file = Path(scanned_path)
+            seen = set()
             
-            # Try to find in scanned files
-            for scanned_path in self.scanned_files.keys():
-                scanned_file = Path(scanned_path)
+            for root in scanned_file.parents:
+                if root not in self.root_paths:
+                    continue
                 
-                # Check if this file matches the import
-                # Convert file path to module path
-                for root in self.root_paths:
-                    try:
-                        rel_path = scanned_file.relative_to(root)
-                        file_module_parts = list(rel_path.with_suffix("").parts)
-                        
-                        # Remove __init__ if present
-                        if file_module_parts and file_module_parts[-1] == "__init__":
-                            file_module_parts = file_module_parts[:-1]
-                        
-                        # Check if module parts match
-                        if file_module_parts == module_parts:
-                            target_files.append(scanned_path)
-                            break
-                        
-                        # Check if this is an __init__.py for the module
-                        if (
-                            scanned_file.name == "__init__.py"
-                            and file_module_parts == module_parts
-                        ):
-                            target_files.append(scanned_path)
-                            break
-                    except ValueError:
-                        continue
-        
-        return target_files
-    
-    def _calculate_complexity(self, ast_info: FileASTInfo) -> Dict[str, float]:
-        """Calculate complexity metrics for a file."""
-        metrics = {
-            "total_lines": float(ast_info.total_lines),
-            "code_lines": float(ast_info.code_lines),
-            "num_functions": float(len(ast_info.functions)),
-            "num_classes": float(len(ast_info.classes)),
-            "num_imports": float(len(ast_info.imports)),
-            "avg_function_length": 0.0,
-            "max_function_length": 0.0,
-        }
+                rel_path = scanned_file.relative_to(root)
+                file_module_parts = tuple(
+                    sys.intern(part) for part in rel_path.with_suffix("").parts
+                )
+                
+                # Remove __init__ if present
+                if file_module_parts and file_module_parts[-1] == "__init__":
+                    file_module_parts = file_module_parts[:-1]
+                
+                # A file is listed once per module name, however many roots match
+                if file_module_parts not in seen:
+                    seen.add(file_module_parts)
+                    index[file_module_parts].append(scanned_path)
         
-        if ast_info.functions:
-            func_lengths = [
-                f.line_end - f.line_start for f in ast_info.functions
-            ]
-            metrics["avg_function_length"] = sum(func_lengths) / len(func_lengths)
-            metrics["max_function_length"] = max(func_lengths) if func_lengths else 0.0
+        return {parts: tuple(paths) for parts, paths in index.items()}
+    
+    def _calculate_all_complexity(self) -> List[Dict[str, float]]:
+        """
+        Calculate complexity metrics for every scanned file in one sweep.
         
-        # Calculate nesting depth (simplified)
-        metrics["max_nesting"] = 1.0  # Placeholder - would need AST traversal
+        Returns:
+            One metrics dict per file, in scan order
+        """
+        store = self.ast_store
+        num_files = len(store.files)
+        
+        # Per-file counts straight from the store's file-id columns
+        num_functions = np.bincount(store.function_file, minlength=num_files).astype(np.float64)
+        num_classes = np.bincount(store.class_file, minlength=num_files).astype(np.float64)
+        num_imports = np.bincount(store.import_file, minlength=num_files).astype(np.float64)
+        total_lines = np.array(
+            [ast_info.total_lines for ast_info in self.scanned_files.values()], dtype=np.float64
+        )
+        code_lines = np.array(
+            [ast_info.code_lines for ast_info in self.scanned_files.values()], dtype=np.float64
+        )
         
-        # Cyclomatic complexity approximation
-        metrics["complexity_score"] = (
-            metrics["num_functions"] * 2
-            + metrics["num_classes"] * 3
-            + metrics["num_imports"] * 0.5
+        # Function length aggregates over the flat function column
+        func_lengths = np.array(
+            [f.line_end - f.line_start for f in store.functions], dtype=np.float64
+        )
+        function_file = np.asarray(store.function_file, dtype=np.intp)
+        length_sums = np.bincount(function_file, weights=func_lengths, minlength=num_files)
+        max_lengths = np.zeros(num_files, dtype=np.float64)
+        np.maximum.at(max_lengths, function_file, func_lengths)
+        avg_lengths = np.divide(
+            length_sums, num_functions,
+            out=np.zeros(num_files, dtype=np.float64), where=num_functions > 0,
         )
         
-        return metrics
+        # Cyclomatic complexity approximation
+        complexity_scores = num_functions * 2 + num_classes * 3 + num_imports * 0.5
+        
+        return [
+            {
+                "total_lines": row[0],
+                "code_lines": row[1],
+                "num_functions": row[2],
+                "num_classes": row[3],
+                "num_imports": row[4],
+                "avg_function_length": row[5],
+                "max_function_length": row[6],
+                # Nesting depth placeholder - would need AST traversal
+                "max_nesting": 1.0,
+                "complexity_score": row[7],
+            }
+            for row in zip(
+                total_lines.tolist(), code_lines.tolist(),
+                num_functions.tolist(), num_classes.tolist(), num_imports.tolist(),
+                avg_lengths.tolist(), max_lengths.tolist(), complexity_scores.tolist(),
+            )
+        ]
     
     def _map_function_usage(
         self, file_path: str, ast_info: FileASTInfo
-    ) -> Dict[str, Set[str]]:
+    ) -> Dict[str, FrozenSet[str]]:
         """Map function names to files that might use them."""
         # This is a simplified version - in a full implementation,
-        # we'd do cross-file call graph analysis
-        usage_map = defaultdict(set)
-        
-        # For now, we'll build this when building dependency graphs
-        # This is a placeholder structure
-        for func in ast_info.functions:
-            usage_map[func.name] = set()
-        
-        return dict(usage_map)
+        # we'd do cross-file call graph analysis; until then every entry
+        # shares one immutable empty set
+        return {func.name: _NO_USAGE for func in ast_info.functions}
     
     def _map_class_usage(
         self, file_path: str, ast_info: FileASTInfo
-    ) -> Dict[str, Set[str]]:
+    ) -> Dict[str, FrozenSet[str]]:
         """Map class names to files that might use them."""
-        usage_map = defaultdict(set)
-        
-        for cls in ast_info.classes:
-            usage_map[cls.name] = set()
-        
-        return dict(usage_map)
+        return {cls.name: _NO_USAGE for cls in ast_info.classes}
     
     def _build_dependency_graphs(self, analysis: CodebaseAnalysis):
         """Build forward and reverse dependency graphs."""
+        reverse_graph: Dict[str, Set[str]] = defaultdict(set)
+        
         for file_path, file_analysis in analysis.files.items():
             # Forward dependencies (what this file depends on)
-            deps = set()
-            for dep in file_analysis.dependencies:
-                deps.add(dep.target_file)
+            deps = {dep.target_file for dep in file_analysis.dependencies}
             analysis.dependency_graph[file_path] = deps
             
-            # Reverse dependencies (what depends on this file)
-            if file_path not in analysis.reverse_dependency_graph:
-                analysis.reverse_dependency_graph[file_path] = set()
-            
-            for dep in file_analysis.dependencies:
-                target = dep.target_file
-                if target not in analysis.reverse_dependency_graph:
-                    analysis.reverse_dependency_graph[target] = set()
-                analysis.reverse_dependency_graph[target].add(file_path)
+            # Reverse dependencies (what depends on this file); every file
+            # gets an entry, even if nothing imports it
+            reverse_graph.setdefault(file_path, set())
+            for target in deps:
+                reverse_graph[target].add(file_path)
+        
+        # Plain dict so lookups by callers never insert keys
+        analysis.reverse_dependency_graph = dict(reverse_graph)
         
         # Update dependents in file analyses
         for file_path, file_analysis in analysis.files.items():
-            file_analysis.dependents = list(
-                analysis.reverse_dependency_graph.get(file_path, set())
-            )
+            file_analysis.dependents = list(analysis.reverse_dependency_graph[file_path])
+        
+        # Compact int32 CSR copies of both graphs for traversals
+        analysis.dependency_csr = DependencyGraphCSR.from_edges(
+            list(analysis.reverse_dependency_graph),
+            (
+                (file_path, target)
+                for file_path, targets in analysis.dependency_graph.items()
+                for target in targets
+            ),
+        )
+        analysis.reverse_dependency_csr = analysis.dependency_csr.reversed()
     
     def _calculate_risk_scores(self, analysis: CodebaseAnalysis):
         """Calculate risk scores for all files."""
         from config.settings import settings
         
-        for file_path, file_analysis in analysis.files.items():
-            risk_score = self._calculate_file_risk(file_path, file_analysis, analysis)
-            file_analysis.risk_score = risk_score
-    
-    def _calculate_file_risk(
-        self, file_path: str, file_analysis: FileAnalysis, analysis: CodebaseAnalysis
-    ) -> RiskScore:
-        """Calculate risk score for a single file."""
-        from config.settings import settings
-        
-        factors = {}
-        
-        # Complexity factor
-        complexity = file_analysis.complexity_metrics.get("complexity_score", 0)
-        factors["complexity"] = min(complexity / 50.0, 1.0)  # Normalize to 0-1
-        
-        # Dependency factor (more dependencies = higher risk)
-        num_deps = len(file_analysis.dependencies)
-        factors["dependencies"] = min(num_deps / 20.0, 1.0)
-        
-        # Dependents factor (more dependents = higher risk if changed)
-        num_dependents = len(file_analysis.dependents)
-        factors["dependents"] = min(num_dependents / 10.0, 1.0)
-        
-        # Size factor
-        code_lines = file_analysis.complexity_metrics.get("code_lines", 0)
-        factors["size"] = min(code_lines / 2000.0, 1.0)
-        
-        # Test coverage factor (placeholder - would need test analysis)
-        factors["test_coverage"] = 0.5  # Assume medium risk
-        
-        # Calculate weighted overall score
+        file_analyses = list(analysis.files.values())
+        if not file_analyses:
+            return
+        
+        # Gather raw inputs once, then derive every factor column at once
+        complexity = np.array([
+            fa.complexity_metrics.get("complexity_score", 0) for fa in file_analyses
+        ], dtype=np.float64)
+        num_deps = np.array([len(fa.dependencies) for fa in file_analyses], dtype=np.float64)
+        num_dependents = np.array([len(fa.dependents) for fa in file_analyses], dtype=np.float64)
+        code_lines = np.array([
+            fa.complexity_metrics.get("code_lines", 0) for fa in file_analyses
+        ], dtype=np.float64)
+        
+        # One row per file, columns in RISK_FACTORS order, each normalized to 0-1
+        factors_matrix = np.column_stack((
+            np.minimum(complexity / 50.0, 1.0),  # Complexity factor
+            np.minimum(num_deps / 20.0, 1.0),  # More dependencies = higher risk
+            np.minimum(num_dependents / 10.0, 1.0),  # More dependents = higher risk if changed
+            np.minimum(code_lines / 2000.0, 1.0),  # Size factor
+            np.full(len(file_analyses), 0.5),  # Test coverage placeholder: assume medium risk
+        ))
+        
+        # Weighted overall scores for every file at once. Accumulating column
+        # by column in weight order (rather than factors_matrix @ weights)
+        # keeps the exact float results, and so the ranking ties, of a
+        # sequential weighted sum
         weights = settings.RISK_WEIGHTS
-        overall_score = sum(
-            factors.get(key, 0) * weights.get(key, 0) for key in weights
-        )
-        
-        # Generate explanation
-        explanation_parts = []
-        if factors["complexity"] > 0.7:
-            explanation_parts.append("High complexity")
-        if factors["dependencies"] > 0.7:
-            explanation_parts.append("Many dependencies")
-        if factors["dependents"] > 0.7:
-            explanation_parts.append("Many files depend on this")
-        if factors["size"] > 0.7:
-            explanation_parts.append("Large file size")
-        
-        explanation = "; ".join(explanation_parts) if explanation_parts else "Low to medium risk"
-        
-        return RiskScore(
-            overall_score=overall_score,
-            factors=factors,
-            explanation=explanation,
-        )
+        overall = np.zeros(len(file_analyses), dtype=np.float64)
+        for key, weight in weights.items():
+            if key in RISK_FACTORS:
+                overall += factors_matrix[:, RISK_FACTORS.index(key)] * weight
+        overall_scores = overall.tolist()
+        
+        # Encode which factors exceed the threshold as a bitmask per file and
+        # look the explanation up instead of branching on each factor
+        exceeded = factors_matrix[:, :len(RISK_EXPLANATIONS)] > RISK_EXPLANATION_THRESHOLD
+        explanation_ids = (exceeded @ (1 << np.arange(len(RISK_EXPLANATIONS)))).tolist()
+        
+        for file_analysis, factor_row, overall_score, explanation_id in zip(
+            file_analyses, factors_matrix.tolist(), overall_scores, explanation_ids
+        ):
+            file_analysis.risk_score = RiskScore(
+                overall_score=overall_score,
+                factors=dict(zip(RISK_FACTORS, factor_row)),
+                explanation=_EXPLANATION_TABLE[explanation_id],
+            )
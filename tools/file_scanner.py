@@ -1,10 +1,20 @@
 """File scanner tool using AST parsing."""
 
 import ast
+import atexit
 import os
+import re
+import sys
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional
-import fnmatch
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    FIRST_COMPLETED,
+    wait,
+)
+import pathspec
 
 from models.ast_models import (
     FileASTInfo,
@@ -15,6 +25,187 @@ from models.ast_models import (
 )
 from models.agent_models import ToolResponse
 from config.settings import settings
+from tools.ast_cache import get_ast_cache
+
+
+# A line counts as code if its first non-whitespace byte is not "#"
+_CODE_LINE_RE = re.compile(rb"^[ \t\r\x0b\x0c]*[^ \t\n\r\x0b\x0c#]", re.MULTILINE)
+
+# Below this many files, process pool startup costs more than parsing serially
+PARALLEL_PARSE_MIN_FILES = 32
+
+_worker_pool: Optional[ProcessPoolExecutor] = None
+_worker_pool_workers = 0
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Get the shared worker process pool, creating it on first use.
+    
+    Scans and knowledge-base builds both run on this pool, so process startup
+    and module imports in every worker are paid once per process rather than
+    once per scan or build.
+    
+    Args:
+        workers: Number of worker processes wanted
+        
+    Returns:
+        ProcessPoolExecutor with that many workers
+    """
+    global _worker_pool, _worker_pool_workers
+    
+    with _worker_pool_lock:
+        if _worker_pool is None or _worker_pool_workers != workers:
+            if _worker_pool is not None:
+                _worker_pool.shutdown(wait=False)
+            else:
+                atexit.register(_shutdown_worker_pool)
+            _worker_pool = ProcessPoolExecutor(max_workers=workers)
+            _worker_pool_workers = workers
+        return _worker_pool
+
+
+def _shutdown_worker_pool():
+    """Stop the shared worker process pool."""
+    if _worker_pool is not None:
+        _worker_pool.shutdown()
+
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    """
+    Render a Name or Attribute chain (e.g. "a.b.c") without ast.unparse.
+    
+    Args:
+        node: Expression node
+        
+    Returns:
+        Dotted name, or None if the node is anything more complex
+    """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    parts.reverse()
+    return ".".join(parts)
+
+
+def _unparse(node: ast.AST) -> str:
+    """ast.unparse, short-circuiting the common dotted-name case."""
+    return _dotted(node) or ast.unparse(node)
+
+
+# Definitions and imports are statements, and statements only nest inside
+# other statements, except handlers and match cases
+_STATEMENT_CONTAINERS = (ast.stmt, ast.excepthandler, ast.match_case)
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+class _ASTCollector:
+    """
+    Collects functions, classes and imports in one traversal.
+    
+    Definitions local to a function body (closures, helper classes) are
+    skipped; imports are collected at any depth since function-level
+    imports are still real dependencies.
+    """
+    
+    def __init__(self, scanner: "FileScanner"):
+        self._scanner = scanner
+        self.functions: List[FunctionNode] = []
+        self.classes: List[ClassNode] = []
+        self.imports: List[ImportNode] = []
+        self._handlers = {
+            ast.FunctionDef: self.visit_FunctionDef,
+            ast.AsyncFunctionDef: self.visit_AsyncFunctionDef,
+            ast.ClassDef: self.visit_ClassDef,
+            ast.Import: self.visit_Import,
+            ast.ImportFrom: self.visit_ImportFrom,
+        }
+        self._import_handlers = {
+            ast.Import: self.visit_Import,
+            ast.ImportFrom: self.visit_ImportFrom,
+        }
+    
+    def visit(self, tree: ast.AST):
+        """Walk the tree with an explicit stack instead of recursive visits."""
+        stack = [(tree, False)]
+        
+        while stack:
+            node, in_function = stack.pop()
+            node_type = type(node)
+            handlers = self._import_handlers if in_function else self._handlers
+            handler = handlers.get(node_type)
+            if handler is not None:
+                handler(node)
+            
+            # Expressions can never contain definitions, so only descend into
+            # statement-level children; push reversed to keep source order
+            child_in_function = in_function or node_type in _FUNCTION_TYPES
+            children = [
+                (child, child_in_function) for child in ast.iter_child_nodes(node)
+                if isinstance(child, _STATEMENT_CONTAINERS)
+            ]
+            children.reverse()
+            stack.extend(children)
+    
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.append(
+                ImportNode(
+                    module=alias.name,
+                    alias=alias.asname,
+                    import_type="import",
+                )
+            )
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module or ""
+        imported_items = [alias.name for alias in node.names]
+        
+        self.imports.append(
+            ImportNode(
+                module=module,
+                imported_items=imported_items,
+                import_type="from_import_all" if "*" in imported_items else "from_import",
+            )
+        )
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.functions.append(self._scanner._parse_function(node, is_method=False))
+    
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        self.functions.append(
+            self._scanner._parse_function(node, is_method=False, is_async=True)
+        )
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        scanner = self._scanner
+        # end_lineno is always populated on Python 3.8+, no fallback needed
+        class_node = ClassNode(
+            name=node.name,
+            line_start=node.lineno,
+            line_end=node.end_lineno,
+            bases=[scanner._get_name(base) for base in node.bases],
+            decorators=[scanner._get_name(dec) for dec in node.decorator_list],
+            docstring=ast.get_docstring(node),
+        )
+        
+        # Extract methods
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef):
+                method = scanner._parse_function(item, is_method=True, parent_class=node.name)
+                class_node.methods.append(method)
+            elif isinstance(item, ast.AsyncFunctionDef):
+                method = scanner._parse_function(
+                    item, is_method=True, parent_class=node.name, is_async=True
+                )
+                class_node.methods.append(method)
+        
+        self.classes.append(class_node)
 
 
 class FileScanner:
@@ -30,20 +221,29 @@ class FileScanner:
         """
         self.root_path = Path(root_path).resolve()
         self.exclude_patterns = exclude_patterns or settings.EXCLUDE_PATTERNS
+        # Compile all patterns once into a single matcher
+        if self.exclude_patterns is settings.EXCLUDE_PATTERNS:
+            self._exclude_spec = settings.EXCLUDE_SPEC
+        else:
+            self._exclude_spec = pathspec.PathSpec.from_lines(
+                "gitwildmatch", self.exclude_patterns
+            )
         self.max_file_size_mb = settings.MAX_FILE_SIZE_MB
     
-    def should_exclude(self, file_path: Path) -> bool:
-        """Check if a file should be excluded based on patterns."""
-        path_str = str(file_path)
-        # Normalize path separators for Windows
-        path_str = path_str.replace("\\", "/")
-        
-        for pattern in self.exclude_patterns:
-            if fnmatch.fnmatch(path_str, pattern) or fnmatch.fnmatch(
-                file_path.name, pattern
-            ):
-                return True
-        return False
+    def should_exclude(self, file_path: Path, is_dir: bool = False) -> bool:
+        """Check if a file or directory should be excluded based on patterns."""
+        # Patterns use gitignore semantics relative to the scan root
+        try:
+            path_str = file_path.relative_to(self.root_path).as_posix()
+        except ValueError:
+            path_str = file_path.as_posix()
+        
+        # A trailing slash lets directory patterns like "**/venv/**" prune
+        # the directory itself instead of every file below it
+        if is_dir:
+            path_str += "/"
+        
+        return self._exclude_spec.match_file(path_str)
     
     def scan_directory(self) -> ToolResponse:
         """
@@ -67,41 +267,86 @@ class FileScanner:
             )
         
         python_files = []
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
         
-        for root, dirs, files in os.walk(self.root_path):
-            # Filter out excluded directories
-            dirs[:] = [
-                d
-                for d in dirs
-                if not self.should_exclude(Path(root) / d)
-            ]
-            
-            for file in files:
-                if not file.endswith(".py"):
-                    continue
-                
-                file_path = Path(root) / file
-                
-                # Check if file should be excluded
-                if self.should_exclude(file_path):
-                    continue
-                
-                # Check file size
-                try:
-                    size_mb = file_path.stat().st_size / (1024 * 1024)
-                    if size_mb > self.max_file_size_mb:
-                        continue
-                except OSError:
-                    continue
-                
-                python_files.append(file_path)
+        # Directory listing is I/O-bound, so walk the tree with a thread pool:
+        # each task lists one directory and its subdirectories are submitted
+        # as new tasks as soon as they are discovered
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {executor.submit(self._scan_single_directory, self.root_path)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    subdirs, files = future.result()
+                    python_files.extend(files)
+                    pending.update(
+                        executor.submit(self._scan_single_directory, subdir)
+                        for subdir in subdirs
+                    )
+        
+        # Completion order is nondeterministic; keep results stable
+        python_files.sort()
         
         return ToolResponse(
             success=True,
             message=f"Found {len(python_files)} Python files",
-            data={"files": [str(f) for f in python_files]},
+            data={"files": [sys.intern(str(f)) for f in python_files]},
         )
     
+    def _scan_single_directory(self, directory: Path) -> Tuple[List[Path], List[Path]]:
+        """
+        List a single directory.
+        
+        Args:
+            directory: Directory to list
+            
+        Returns:
+            Tuple of (subdirectories to descend into, Python files to parse)
+        """
+        subdirs = []
+        python_files = []
+        max_size_bytes = self.max_file_size_mb * 1024 * 1024
+        
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            return subdirs, python_files
+        
+        for entry in entries:
+            # DirEntry caches the d_type from readdir, so type checks and
+            # name filters cost no extra syscall
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            
+            if is_dir:
+                # Filter out excluded directories
+                entry_path = Path(entry.path)
+                if not self.should_exclude(entry_path, is_dir=True):
+                    subdirs.append(entry_path)
+                continue
+            
+            if not entry.name.endswith(".py"):
+                continue
+            
+            # Check if file should be excluded
+            entry_path = Path(entry.path)
+            if self.should_exclude(entry_path):
+                continue
+            
+            # Check file size
+            try:
+                if entry.stat().st_size > max_size_bytes:
+                    continue
+            except OSError:
+                continue
+            
+            python_files.append(entry_path)
+        
+        return subdirs, python_files
+    
     def parse_file(self, file_path: Path) -> FileASTInfo:
         """
         Parse a single Python file and extract AST information.
@@ -115,105 +360,44 @@ class FileScanner:
         ast_info = FileASTInfo(file_path=str(file_path))
         
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            # ast.parse reads raw bytes and honours PEP 263 coding
+            # declarations itself, so skip the text-mode decode
+            content = file_path.read_bytes()
             
-            # Count lines
-            lines = content.splitlines()
-            ast_info.total_lines = len(lines)
-            ast_info.code_lines = sum(
-                1 for line in lines if line.strip() and not line.strip().startswith("#")
+            # Count lines; a C-level byte count, plus one for an unterminated last line
+            ast_info.total_lines = content.count(b"\n") + (
+                1 if content and not content.endswith(b"\n") else 0
             )
+            ast_info.code_lines = len(_CODE_LINE_RE.findall(content))
+            
+            # A file of only blank lines and comments (e.g. an empty
+            # __init__.py) has nothing to extract and cannot be a syntax
+            # error, so skip the ast.parse; anything else is parsed so
+            # parse_error is always reported
+            if not ast_info.code_lines:
+                return ast_info
             
             # Parse AST
             tree = ast.parse(content, filename=str(file_path))
             
             # Extract information
-            ast_info.imports = self._extract_imports(tree)
-            ast_info.classes = self._extract_classes(tree)
-            ast_info.functions = self._extract_functions(tree)
+            ast_info.functions, ast_info.classes, ast_info.imports = self._collect_all(tree)
             ast_info.variables = self._extract_variables(tree)
             
         except SyntaxError as e:
             ast_info.parse_error = f"SyntaxError: {str(e)}"
-        except UnicodeDecodeError as e:
-            ast_info.parse_error = f"UnicodeDecodeError: {str(e)}"
         except Exception as e:
             ast_info.parse_error = f"Error: {str(e)}"
         
         return ast_info
     
-    def _extract_imports(self, tree: ast.AST) -> List[ImportNode]:
-        """Extract all import statements from AST."""
-        imports = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.append(
-                        ImportNode(
-                            module=alias.name,
-                            alias=alias.asname,
-                            import_type="import",
-                        )
-                    )
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module or ""
-                imported_items = [alias.name for alias in node.names]
-                
-                imports.append(
-                    ImportNode(
-                        module=module,
-                        imported_items=imported_items,
-                        import_type="from_import_all" if "*" in imported_items else "from_import",
-                    )
-                )
-        
-        return imports
-    
-    def _extract_functions(self, tree: ast.AST) -> List[FunctionNode]:
-        """Extract all function definitions from AST."""
-        functions = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                func = self._parse_function(node, is_method=False)
-                functions.append(func)
-            elif isinstance(node, ast.AsyncFunctionDef):
-                func = self._parse_function(node, is_method=False, is_async=True)
-                functions.append(func)
-        
-        return functions
-    
-    def _extract_classes(self, tree: ast.AST) -> List[ClassNode]:
-        """Extract all class definitions from AST."""
-        classes = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                class_node = ClassNode(
-                    name=node.name,
-                    line_start=node.lineno,
-                    line_end=node.end_lineno or node.lineno,
-                    bases=[self._get_name(base) for base in node.bases],
-                    decorators=[self._get_name(dec) for dec in node.decorator_list],
-                    docstring=ast.get_docstring(node),
-                )
-                
-                # Extract methods
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef):
-                        method = self._parse_function(item, is_method=True, parent_class=node.name)
-                        class_node.methods.append(method)
-                    elif isinstance(item, ast.AsyncFunctionDef):
-                        method = self._parse_function(
-                            item, is_method=True, parent_class=node.name, is_async=True
-                        )
-                        class_node.methods.append(method)
-                
-                classes.append(class_node)
-        
-        return classes
+    def _collect_all(
+        self, tree: ast.AST
+    ) -> Tuple[List[FunctionNode], List[ClassNode], List[ImportNode]]:
+        """Extract functions, classes and imports from AST in a single pass."""
+        collector = _ASTCollector(self)
+        collector.visit(tree)
+        return collector.functions, collector.classes, collector.imports
     
     def _parse_function(
         self,
@@ -223,82 +407,85 @@ class FileScanner:
         is_async: bool = False,
     ) -> FunctionNode:
         """Parse a function or method node."""
-        # Extract parameters
-        params = []
-        for arg in node.args.args:
-            param = arg.arg
-            if arg.annotation:
-                param += f": {ast.unparse(arg.annotation)}"
-            params.append(param)
+        # Extract parameters; most signatures are empty or unannotated, so
+        # those skip the annotation rendering entirely
+        args = node.args.args
+        if not args:
+            params = []
+        else:
+            params = [
+                arg.arg if arg.annotation is None
+                else f"{arg.arg}: {_unparse(arg.annotation)}"
+                for arg in args
+            ]
         
         # Extract return annotation
-        return_annotation = None
-        if node.returns:
-            return_annotation = ast.unparse(node.returns)
+        returns = node.returns
+        return_annotation = None if returns is None else _unparse(returns)
         
+        decorator_list = node.decorator_list
         return FunctionNode(
             name=node.name,
             line_start=node.lineno,
-            line_end=node.end_lineno or node.lineno,
+            line_end=node.end_lineno,
             parameters=params,
             return_annotation=return_annotation,
-            decorators=[self._get_name(dec) for dec in node.decorator_list],
+            decorators=[self._get_name(dec) for dec in decorator_list] if decorator_list else [],
             docstring=ast.get_docstring(node),
             is_async=is_async,
             is_method=is_method,
             parent_class=parent_class,
         )
     
-    def _extract_variables(self, tree: ast.AST) -> List[VariableNode]:
+    def _extract_variables(self, tree: ast.Module) -> List[VariableNode]:
         """Extract global variables and constants from AST."""
         variables = []
         
-        # Only extract module-level assignments
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Module):
-                for item in node.body:
-                    if isinstance(item, ast.Assign):
-                        for target in item.targets:
-                            if isinstance(target, ast.Name):
-                                var_name = target.id
-                                is_constant = var_name.isupper() and "_" in var_name
-                                
-                                annotation = None
+        # Only module-level assignments count, so read the module body
+        # directly instead of walking the whole tree
+        for item in tree.body:
+            if isinstance(item, ast.Assign):
+                for target in item.targets:
+                    if isinstance(target, ast.Name):
+                        var_name = target.id
+                        is_constant = var_name.isupper() and "_" in var_name
+                        
+                        annotation = None
+                        value = None
+                        
+                        if item.value:
+                            try:
+                                value = ast.unparse(item.value)
+                            except:
                                 value = None
-                                
-                                if item.value:
-                                    try:
-                                        value = ast.unparse(item.value)
-                                    except:
-                                        value = None
-                                
-                                variables.append(
-                                    VariableNode(
-                                        name=var_name,
-                                        line=item.lineno,
-                                        annotation=annotation,
-                                        value=value,
-                                        is_constant=is_constant,
-                                    )
-                                )
-                    elif isinstance(item, ast.AnnAssign):
-                        # Annotated assignment (e.g., x: int = 5)
-                        if isinstance(item.target, ast.Name):
-                            var_name = item.target.id
-                            annotation = (
-                                ast.unparse(item.annotation) if item.annotation else None
-                            )
-                            value = ast.unparse(item.value) if item.value else None
-                            
-                            variables.append(
-                                VariableNode(
-                                    name=var_name,
-                                    line=item.lineno,
-                                    annotation=annotation,
-                                    value=value,
-                                    is_constant=var_name.isupper() and "_" in var_name,
-                                )
+                        
+                        variables.append(
+                            VariableNode(
+                                name=var_name,
+                                line=item.lineno,
+                                annotation=annotation,
+                                value=value,
+                                is_constant=is_constant,
                             )
+                        )
+            elif isinstance(item, ast.AnnAssign):
+                # Annotated assignment (e.g., x: int = 5)
+                if isinstance(item.target, ast.Name):
+                    var_name = item.target.id
+                    annotation = (
+                        ast.unparse(item.annotation) if item.annotation else None
+                    )
+                    value = ast.unparse(item.value) if item.value else None
+                    
+                    variables.append(
+                        VariableNode(
+                            name=var_name,
+                            line=item.lineno,
+                            annotation=annotation,
+                            value=value,
+                            is_constant=var_name.isupper() and "_" in var_name,
+                        )
+                    )
         
         return variables
     
@@ -307,19 +494,21 @@ class FileScanner:
         try:
             if isinstance(node, ast.Name):
                 return node.id
-            elif isinstance(node, ast.Attribute):
-                return ast.unparse(node)
             elif isinstance(node, ast.Call):
-                return ast.unparse(node.func)
+                return _unparse(node.func)
             else:
-                return ast.unparse(node)
+                return _unparse(node)
         except:
             return str(type(node).__name__)
     
-    def scan_all_files(self) -> Dict[str, FileASTInfo]:
+    def scan_all_files(self, parallel: bool = True) -> Dict[str, FileASTInfo]:
         """
         Scan all Python files in the directory and parse them.
         
+        Args:
+            parallel: Parse in worker processes (set False to stay in-process,
+                e.g. under debuggers or where forking is unavailable)
+        
         Returns:
             Dictionary mapping file paths to FileASTInfo objects
         """
@@ -328,12 +517,70 @@ class FileScanner:
         if not scan_result.success:
             return {}
         
-        file_paths = scan_result.data.get("files", [])
-        scanned_files = {}
+        # Key by the interned path strings from the scan
+        files = scan_result.data.get("files", [])
+        ast_infos = self.parse_files(
+            [Path(f) for f in files], workers=None if parallel else 1
+        )
+        
+        return dict(zip(files, ast_infos))
+    
+    def parse_files(
+        self, file_paths: List[Path], workers: Optional[int] = None
+    ) -> List[FileASTInfo]:
+        """
+        Parse many Python files, spreading the work across processes.
+        
+        Args:
+            file_paths: Paths of the Python files to parse
+            workers: Number of worker processes (defaults to os.cpu_count())
+            
+        Returns:
+            List of FileASTInfo objects in the same order as file_paths
+        """
+        cache = get_ast_cache()
+        if cache is None:
+            return self._parse_files_uncached(file_paths, workers)
+        
+        # Serve unchanged files from the on-disk cache and parse only the rest
+        ast_infos: List[Optional[FileASTInfo]] = [None] * len(file_paths)
+        misses = []
+        for i, file_path in enumerate(file_paths):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                misses.append((i, None))
+                continue
+            
+            ast_info = cache.get(file_path, stat)
+            if ast_info is None:
+                misses.append((i, stat))
+            else:
+                ast_infos[i] = ast_info.intern_strings()
+        
+        parsed = self._parse_files_uncached([file_paths[i] for i, _ in misses], workers)
+        for (i, stat), ast_info in zip(misses, parsed):
+            ast_infos[i] = ast_info
+            if stat is not None:
+                cache.put(file_paths[i], stat, ast_info)
+        
+        return ast_infos
+    
+    def _parse_files_uncached(
+        self, file_paths: List[Path], workers: Optional[int] = None
+    ) -> List[FileASTInfo]:
+        """Parse files without consulting the AST cache."""
+        workers = workers or os.cpu_count() or 1
         
-        for file_path_str in file_paths:
-            file_path = Path(file_path_str)
-            ast_info = self.parse_file(file_path)
-            scanned_files[str(file_path)] = ast_info
+        # Parsing is CPU-bound, so spread it across processes to sidestep the GIL
+        if workers == 1 or len(file_paths) < PARALLEL_PARSE_MIN_FILES:
+            return [self.parse_file(file_path) for file_path in file_paths]
         
-        return scanned_files
+        # About four chunks per worker amortizes IPC while still balancing
+        # uneven file sizes across workers
+        chunksize = max(1, len(file_paths) // (workers * 4))
+        executor = get_worker_pool(workers)
+        return [
+            ast_info.intern_strings()
+            for ast_info in executor.map(self.parse_file, file_paths, chunksize=chunksize)
+        ]
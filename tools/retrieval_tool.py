@@ -1,23 +1,86 @@
 """Retrieval tool for RAG-based context retrieval."""
 
-from typing import List, Dict, Any, Optional
-from pathlib import Path
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import time
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
 
 from models.agent_models import ToolResponse
+from config.settings import settings
 from knowledge_base.vector_store import VectorStore
+from tools.file_scanner import get_worker_pool
+
+
+# Number of distinct (query, top_k) results kept per RetrievalTool
+RETRIEVAL_CACHE_SIZE = 1024
+
+# Shared-cache key whose value scopes every cached result to one build
+REDIS_VERSION_KEY = "rag:version"
+
+# Seconds a fetched REDIS_VERSION_KEY value is reused before reading it again;
+# bounds how long another process's rebuild can go unnoticed
+REDIS_VERSION_TTL = 2.0
+
+# Bound once so the document builders skip per-call attribute lookups
+_get_name = attrgetter("name")
+_get_module = attrgetter("module")
+_get_target_file = attrgetter("target_file")
+
+# Budgets that keep documents within the embedding model's input window
+# (all-MiniLM-L6-v2 truncates at 256 word pieces); text past them would be
+# tokenized only to be thrown away
+MAX_DOCSTRING_CHARS = 1024
+MAX_DOCUMENT_PARAMETERS = 20
+MAX_DOCUMENT_METHODS = 50
+
+# Below this many files, process pool startup costs more than formatting serially
+PARALLEL_DOCUMENT_MIN_FILES = 200
+
+# Mixed into every file fingerprint; bump it whenever the document builders
+# change their output so the next build re-embeds every file
+# (2: docstrings, parameters and method lists are clipped to the budgets above)
+DOC_FORMAT_VERSION = 2
 
 
 class RetrievalTool:
     """Tool for retrieving relevant context from the knowledge base."""
     
-    def __init__(self, vector_store: Optional[VectorStore] = None):
+    def __init__(
+        self,
+        vector_store: Optional[VectorStore] = None,
+        index_type: Optional[str] = None,
+        redis_client: Optional[Any] = None,
+        cache_ttl: Optional[int] = None,
+    ):
         """
         Initialize the retrieval tool.
         
         Args:
             vector_store: VectorStore instance (creates new if not provided)
+            index_type: FAISS index type for a newly created VectorStore
+                (defaults to settings.FAISS_INDEX_TYPE)
+            redis_client: Redis client for a result cache shared between
+                processes (defaults to one for settings.RETRIEVAL_REDIS_URL,
+                or none if that is unset)
+            cache_ttl: Seconds shared cache entries live, 0 for no expiry
+                (defaults to settings.RETRIEVAL_CACHE_TTL)
         """
-        self.vector_store = vector_store or VectorStore()
+        self.vector_store = vector_store or VectorStore(index_type=index_type)
+        self.redis = redis_client if redis_client is not None else self._connect_redis()
+        self.cache_ttl = settings.RETRIEVAL_CACHE_TTL if cache_ttl is None else cache_ttl
+        
+        # Per-instance LRU of search results, keyed by the shared version
+        # too so a rebuild in another process invalidates it; cleared
+        # whenever this process rebuilds
+        self._cached_search = functools.lru_cache(maxsize=RETRIEVAL_CACHE_SIZE)(
+            self._search
+        )
+        self._redis_version: Optional[int] = None
+        self._redis_version_expires = 0.0
     
     def retrieve(self, query: str, top_k: int = 5) -> ToolResponse:
         """
@@ -30,7 +93,12 @@ class RetrievalTool:
         Returns:
             ToolResponse with retrieved context
         """
-        if not self.vector_store.is_initialized():
+        # Blank queries would still cost a forward pass of the embedding model
+        query = query.strip()
+        if not query:
+            return self._empty_query_response()
+        
+        if not self.vector_store.load(read_only=True):
             return ToolResponse(
                 success=False,
                 message="Knowledge base is not initialized. Please scan and analyze files first.",
@@ -38,15 +106,11 @@ class RetrievalTool:
             )
         
         try:
-            results = self.vector_store.search(query, top_k=top_k)
-            
-            context = []
-            for result in results:
-                context.append({
-                    "content": result.get("content", ""),
-                    "metadata": result.get("metadata", {}),
-                    "score": result.get("score", 0.0),
-                })
+            # Repeated queries skip both the embedding model and the index.
+            # Cached results are shared between calls, so callers get copies
+            context = _copy_results(
+                self._cached_search(query, top_k, self._shared_version())
+            )
             
             return ToolResponse(
                 success=True,
@@ -65,6 +129,162 @@ class RetrievalTool:
                 error=str(e),
             )
     
+    async def aretrieve(self, query: str, top_k: int = 5) -> ToolResponse:
+        """
+        Retrieve relevant context without blocking the event loop.
+        
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            
+        Returns:
+            ToolResponse with retrieved context
+        """
+        # Embedding and index search are CPU-bound local work, so run the
+        # synchronous path in a worker thread
+        return await asyncio.to_thread(self.retrieve, query, top_k)
+    
+    def retrieve_batch(self, queries: List[str], top_k: int = 5) -> List[ToolResponse]:
+        """
+        Retrieve context for several queries with one embedding pass and one index search.
+        
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            
+        Returns:
+            One ToolResponse per query, in the same order
+        """
+        if not self.vector_store.load(read_only=True):
+            return [self.retrieve(query, top_k=top_k) for query in queries]
+        
+        queries = [query.strip() for query in queries]
+        
+        try:
+            # Duplicates are embedded and searched once, blank queries never
+            distinct_queries = [query for query in dict.fromkeys(queries) if query]
+            results = {}
+            if distinct_queries:
+                vectors = self.vector_store.embed_texts(distinct_queries)
+                results = dict(zip(
+                    distinct_queries,
+                    self.vector_store.search_by_vectors(vectors, top_k=top_k),
+                ))
+            
+        except Exception as e:
+            return [
+                ToolResponse(
+                    success=False,
+                    message=f"Retrieval failed: {str(e)}",
+                    error=str(e),
+                )
+                for _ in queries
+            ]
+        
+        return [
+            ToolResponse(
+                success=True,
+                message=f"Retrieved {len(results[query])} relevant contexts",
+                data={
+                    "context": _copy_results(results[query]),
+                    "query": query,
+                    "top_k": top_k,
+                },
+            )
+            if query in results
+            else self._empty_query_response()
+            for query in queries
+        ]
+    
+    @staticmethod
+    def _empty_query_response() -> ToolResponse:
+        """Response for blank queries."""
+        return ToolResponse(
+            success=False,
+            message="Query is empty",
+            error="EmptyQuery",
+        )
+    
+    def _search(
+        self, query: str, top_k: int, version: Optional[int]
+    ) -> Tuple[Dict[str, Any], ...]:
+        """
+        Embed a query and search the vector store (errors are not cached).
+        
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            version: Shared knowledge-base version (see _shared_version),
+                or None to bypass the shared cache
+            
+        Returns:
+            Tuple of result dicts
+        """
+        key = None
+        if version is not None:
+            try:
+                key = self._redis_key(query, top_k, version)
+                cached = self.redis.get(key)
+                if cached is not None:
+                    return tuple(json.loads(cached))
+            except Exception:
+                # The shared cache is best-effort; fall back to searching
+                key = None
+        
+        vector = self.vector_store.embed_query(query)
+        results = tuple(self.vector_store.search_by_vector(vector, top_k=top_k))
+        
+        if key is not None:
+            try:
+                if self.cache_ttl:
+                    self.redis.setex(key, self.cache_ttl, json.dumps(results))
+                else:
+                    # Redis rejects a zero TTL; keep the entry until evicted
+                    self.redis.set(key, json.dumps(results))
+            except Exception:
+                pass
+        
+        return results
+    
+    def _shared_version(self) -> Optional[int]:
+        """
+        Current shared knowledge-base version, re-read at most every REDIS_VERSION_TTL seconds.
+        
+        Returns:
+            Version number, or None if there is no shared cache or it is unreachable
+        """
+        if self.redis is None:
+            return None
+        
+        now = time.monotonic()
+        if now >= self._redis_version_expires:
+            try:
+                self._redis_version = int(self.redis.get(REDIS_VERSION_KEY) or 0)
+            except Exception:
+                # The shared cache is best-effort; search without it
+                self._redis_version = None
+            self._redis_version_expires = now + REDIS_VERSION_TTL
+        return self._redis_version
+    
+    @staticmethod
+    def _redis_key(query: str, top_k: int, version: int) -> str:
+        """Shared cache key, scoped to a knowledge-base version."""
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        return f"rag:{version}:{query_hash}:{top_k}"
+    
+    @staticmethod
+    def _connect_redis() -> Optional[Any]:
+        """Create a Redis client from settings, or None if no URL is configured."""
+        if not settings.RETRIEVAL_REDIS_URL:
+            return None
+        
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("redis not installed. Install with: pip install redis")
+        
+        return redis.Redis.from_url(settings.RETRIEVAL_REDIS_URL)
+    
     def build_knowledge_base(
         self, scanned_files: Dict[str, Any], codebase_analysis: Any
     ) -> ToolResponse:
@@ -79,67 +299,63 @@ class RetrievalTool:
             ToolResponse indicating success/failure
         """
         try:
-            documents = []
-            
-            # Add file-level summaries
-            for file_path, ast_info in scanned_files.items():
-                doc_content = self._file_to_document(file_path, ast_info)
-                documents.append({
-                    "content": doc_content,
-                    "metadata": {
-                        "type": "file_summary",
-                        "file_path": file_path,
-                        "language": ast_info.language,
-                    },
-                })
-                
-                # Add function-level details
-                for func in ast_info.functions:
-                    func_doc = self._function_to_document(file_path, func)
-                    documents.append({
-                        "content": func_doc,
-                        "metadata": {
-                            "type": "function",
-                            "file_path": file_path,
-                            "function_name": func.name,
-                            "line_start": func.line_start,
-                            "line_end": func.line_end,
-                        },
-                    })
-                
-                # Add class-level details
-                for cls in ast_info.classes:
-                    cls_doc = self._class_to_document(file_path, cls)
-                    documents.append({
-                        "content": cls_doc,
-                        "metadata": {
-                            "type": "class",
-                            "file_path": file_path,
-                            "class_name": cls.name,
-                            "line_start": cls.line_start,
-                            "line_end": cls.line_end,
-                        },
-                    })
+            # Only files whose documents would differ from the last build
+            # are re-embedded; the rest stay in the store untouched
+            previous_hashes = (
+                self.vector_store.get_meta("file_hashes", {})
+                if self.vector_store.has_persisted_index()
+                else {}
+            )
+            file_hashes = {
+                file_path: self._file_fingerprint(
+                    file_path,
+                    ast_info,
+                    codebase_analysis.files.get(file_path) if codebase_analysis else None,
+                )
+                for file_path, ast_info in scanned_files.items()
+            }
+            changed_files = {
+                file_path
+                for file_path, file_hash in file_hashes.items()
+                if previous_hashes.get(file_path) != file_hash
+            }
             
-            # Add dependency information
-            if codebase_analysis:
-                for file_path, file_analysis in codebase_analysis.files.items():
-                    deps_doc = self._dependencies_to_document(file_path, file_analysis)
-                    documents.append({
-                        "content": deps_doc,
-                        "metadata": {
-                            "type": "dependencies",
-                            "file_path": file_path,
-                        },
-                    })
+            # Evict documents of changed and removed files
+            self.vector_store.delete_by_metadata(
+                "file_path",
+                [
+                    file_path
+                    for file_path, file_hash in previous_hashes.items()
+                    if file_hashes.get(file_path) != file_hash
+                ],
+            )
             
-            # Add documents to vector store
-            self.vector_store.add_documents(documents)
+            # Documents are streamed into the store batch by batch instead
+            # of being collected into one list first
+            num_documents = self.vector_store.add_documents_iter(
+                self._iter_documents(scanned_files, codebase_analysis, changed_files)
+            )
+            # Switch from exact search to the ANN index once the
+            # collection is large enough to benefit
+            self.vector_store.build_index()
+            self.vector_store.set_meta("file_hashes", file_hashes)
+            self._cached_search.cache_clear()
+            if self.redis is not None:
+                # Bumping the version orphans every shared entry at once;
+                # they expire through their TTL
+                try:
+                    self._redis_version = int(self.redis.incr(REDIS_VERSION_KEY))
+                    self._redis_version_expires = time.monotonic() + REDIS_VERSION_TTL
+                except Exception:
+                    self._redis_version_expires = 0.0
             
             return ToolResponse(
                 success=True,
-                message=f"Built knowledge base with {len(documents)} documents",
-                data={"num_documents": len(documents)},
+                message=f"Built knowledge base with {num_documents} documents",
+                data={
+                    "num_documents": num_documents,
+                    "num_unchanged_files": len(file_hashes) - len(changed_files),
+                },
             )
             
         except Exception as e:
@@ -149,92 +365,263 @@ class RetrievalTool:
                 error=str(e),
             )
     
-    def _file_to_document(self, file_path: str, ast_info: Any) -> str:
+    def _iter_documents(
+        self,
+        scanned_files: Dict[str, Any],
+        codebase_analysis: Any,
+        file_paths: Optional[Set[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every knowledge-base document for the scanned files and analysis.
+        
+        Args:
+            scanned_files: Dictionary of file paths to FileASTInfo
+            codebase_analysis: CodebaseAnalysis object
+            file_paths: Only yield documents for these files (default: all)
+            
+        Yields:
+            Dicts with 'content' and 'metadata' keys
+        """
+        if file_paths is not None:
+            scanned_files = {
+                file_path: ast_info
+                for file_path, ast_info in scanned_files.items()
+                if file_path in file_paths
+            }
+        
+        # Formatting is CPU-bound and independent per file, so large
+        # codebases spread it across processes
+        workers = os.cpu_count() or 1
+        if workers > 1 and len(scanned_files) > PARALLEL_DOCUMENT_MIN_FILES:
+            chunksize = max(1, len(scanned_files) // (workers * 4))
+            # Reuse the scanner's pool instead of starting one per build
+            per_file = get_worker_pool(workers).map(
+                _build_docs_for_file,
+                scanned_files.keys(),
+                scanned_files.values(),
+                chunksize=chunksize,
+            )
+            for documents in per_file:
+                yield from documents
+        else:
+            for file_path, ast_info in scanned_files.items():
+                yield from _build_docs_for_file(file_path, ast_info)
+        
+        # Add dependency information
+        if codebase_analysis:
+            dependencies_to_document = self._dependencies_to_document
+            for file_path, file_analysis in codebase_analysis.files.items():
+                if file_paths is not None and file_path not in file_paths:
+                    continue
+                deps_doc = dependencies_to_document(file_path, file_analysis)
+                if deps_doc is None:
+                    # Nothing to say; don't spend an embedding on it
+                    continue
+                yield {
+                    "content": deps_doc,
+                    "metadata": {
+                        "type": "dependencies",
+                        "file_path": file_path,
+                    },
+                }
+    
+    @staticmethod
+    def _file_fingerprint(file_path: str, ast_info: Any, file_analysis: Any) -> str:
+        """
+        Hash everything a file's documents are built from.
+        
+        Args:
+            file_path: Path of the file
+            ast_info: FileASTInfo for the file
+            file_analysis: FileAnalysis for the file, or None
+            
+        Returns:
+            Hex digest that changes whenever the file's documents would
+        """
+        digest = hashlib.blake2b(ast_info.to_json(), digest_size=16)
+        digest.update(b"%d" % DOC_FORMAT_VERSION)
+        if file_analysis is not None:
+            deps_doc = RetrievalTool._dependencies_to_document(file_path, file_analysis)
+            if deps_doc is not None:
+                digest.update(deps_doc.encode("utf-8"))
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _file_to_document(file_path: str, ast_info: Any) -> str:
         """Convert file AST info to document text."""
-        parts = [
-            f"File: {file_path}",
-            f"Language: {ast_info.language}",
-            f"Total lines: {ast_info.total_lines}",
-            f"Code lines: {ast_info.code_lines}",
-        ]
+        return "\n".join(RetrievalTool._iter_file_parts(file_path, ast_info))
+    
+    @staticmethod
+    def _iter_file_parts(file_path: str, ast_info: Any) -> Iterator[str]:
+        """Yield the lines of a file summary document."""
+        yield f"File: {file_path}"
+        yield f"Language: {ast_info.language}"
+        yield f"Total lines: {ast_info.total_lines}"
+        yield f"Code lines: {ast_info.code_lines}"
         
         if ast_info.functions:
-            func_names = [f.name for f in ast_info.functions]
-            parts.append(f"Functions: {', '.join(func_names)}")
+            yield "Functions: " + ", ".join(map(_get_name, ast_info.functions))
         
         if ast_info.classes:
-            class_names = [c.name for c in ast_info.classes]
-            parts.append(f"Classes: {', '.join(class_names)}")
+            yield "Classes: " + ", ".join(map(_get_name, ast_info.classes))
         
         if ast_info.imports:
-            imports_list = [i.module for i in ast_info.imports[:10]]  # Limit imports
-            parts.append(f"Imports: {', '.join(imports_list)}")
+            # Limit imports
+            yield "Imports: " + ", ".join(map(_get_module, ast_info.imports[:10]))
         
         if ast_info.parse_error:
-            parts.append(f"Parse error: {ast_info.parse_error}")
-        
-        return "\n".join(parts)
+            yield f"Parse error: {ast_info.parse_error}"
     
-    def _function_to_document(self, file_path: str, func: Any) -> str:
+    @staticmethod
+    def _function_to_document(file_path: str, func: Any) -> str:
         """Convert function info to document text."""
-        parts = [
-            f"Function: {func.name}",
-            f"File: {file_path}",
-            f"Lines: {func.line_start}-{func.line_end}",
-        ]
+        return "\n".join(RetrievalTool._iter_function_parts(file_path, func))
+    
+    @staticmethod
+    def _iter_function_parts(file_path: str, func: Any) -> Iterator[str]:
+        """Yield the lines of a function document."""
+        yield f"Function: {func.name}"
+        yield f"File: {file_path}"
+        yield f"Lines: {func.line_start}-{func.line_end}"
         
         if func.parameters:
-            parts.append(f"Parameters: {', '.join(func.parameters)}")
+            yield "Parameters: " + ", ".join(func.parameters[:MAX_DOCUMENT_PARAMETERS])
         
         if func.return_annotation:
-            parts.append(f"Returns: {func.return_annotation}")
+            yield f"Returns: {func.return_annotation}"
         
         if func.docstring:
-            parts.append(f"Docstring: {func.docstring}")
+            yield f"Docstring: {_truncate(func.docstring)}"
         
         if func.is_method:
-            parts.append(f"Method of class: {func.parent_class}")
+            yield f"Method of class: {func.parent_class}"
         
         if func.is_async:
-            parts.append("Type: async function")
-        
-        return "\n".join(parts)
+            yield "Type: async function"
     
-    def _class_to_document(self, file_path: str, cls: Any) -> str:
+    @staticmethod
+    def _class_to_document(file_path: str, cls: Any) -> str:
         """Convert class info to document text."""
-        parts = [
-            f"Class: {cls.name}",
-            f"File: {file_path}",
-            f"Lines: {cls.line_start}-{cls.line_end}",
-        ]
+        return "\n".join(RetrievalTool._iter_class_parts(file_path, cls))
+    
+    @staticmethod
+    def _iter_class_parts(file_path: str, cls: Any) -> Iterator[str]:
+        """Yield the lines of a class document."""
+        yield f"Class: {cls.name}"
+        yield f"File: {file_path}"
+        yield f"Lines: {cls.line_start}-{cls.line_end}"
         
         if cls.bases:
-            parts.append(f"Inherits from: {', '.join(cls.bases)}")
+            yield "Inherits from: " + ", ".join(cls.bases)
         
         if cls.methods:
-            method_names = [m.name for m in cls.methods]
-            parts.append(f"Methods: {', '.join(method_names)}")
+            yield "Methods: " + ", ".join(map(_get_name, cls.methods[:MAX_DOCUMENT_METHODS]))
         
         if cls.docstring:
-            parts.append(f"Docstring: {cls.docstring}")
-        
-        return "\n".join(parts)
+            yield f"Docstring: {_truncate(cls.docstring)}"
     
-    def _dependencies_to_document(self, file_path: str, file_analysis: Any) -> str:
-        """Convert dependency info to document text."""
-        parts = [
-            f"Dependencies for: {file_path}",
-        ]
+    @staticmethod
+    def _dependencies_to_document(file_path: str, file_analysis: Any) -> Optional[str]:
+        """Convert dependency info to document text (None for files with no dependency edges)."""
+        # Every analyzed file has a risk score, so only the edges decide
+        if not (file_analysis.dependencies or file_analysis.dependents):
+            return None
+        return "\n".join(RetrievalTool._iter_dependency_parts(file_path, file_analysis))
+    
+    @staticmethod
+    def _iter_dependency_parts(file_path: str, file_analysis: Any) -> Iterator[str]:
+        """Yield the lines of a dependency document."""
+        yield f"Dependencies for: {file_path}"
         
         if file_analysis.dependencies:
-            dep_files = [d.target_file for d in file_analysis.dependencies]
-            parts.append(f"Depends on: {', '.join(dep_files[:10])}")
+            yield "Depends on: " + ", ".join(
+                map(_get_target_file, file_analysis.dependencies[:10])
+            )
         
         if file_analysis.dependents:
-            parts.append(f"Dependents: {', '.join(file_analysis.dependents[:10])}")
+            yield "Dependents: " + ", ".join(file_analysis.dependents[:10])
         
         if file_analysis.risk_score:
-            parts.append(f"Risk score: {file_analysis.risk_score.overall_score:.2f}")
-            parts.append(f"Risk explanation: {file_analysis.risk_score.explanation}")
+            yield f"Risk score: {file_analysis.risk_score.overall_score:.2f}"
+            yield f"Risk explanation: {file_analysis.risk_score.explanation}"
+
+
+def _copy_results(results: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy search results so callers can modify them without touching shared state."""
+    return [{**result, "metadata": dict(result["metadata"])} for result in results]
+
+
+def _truncate(text: str, max_chars: int = MAX_DOCSTRING_CHARS) -> str:
+    """
+    Shorten text to at most max_chars, keeping its head and a little of its tail.
+    
+    Args:
+        text: Text to shorten
+        max_chars: Length budget
         
-        return "\n".join(parts)
+    Returns:
+        text unchanged if it fits, otherwise a clipped version of that length
+    """
+    if len(text) <= max_chars:
+        return text
+    marker = " ...[truncated]... "
+    tail = 20
+    return text[:max_chars - len(marker) - tail] + marker + text[-tail:]
+
+
+def _build_docs_for_file(file_path: str, ast_info: Any) -> List[Dict[str, Any]]:
+    """
+    Build the summary, function and class documents for one file.
+    
+    Module-level so it can be pickled to worker processes.
+    
+    Args:
+        file_path: Path of the file
+        ast_info: FileASTInfo for the file
+        
+    Returns:
+        List of dicts with 'content' and 'metadata' keys
+    """
+    # Bind the builders once instead of looking them up per symbol
+    function_to_document = RetrievalTool._function_to_document
+    class_to_document = RetrievalTool._class_to_document
+    
+    # Add file-level summary
+    documents = [{
+        "content": RetrievalTool._file_to_document(file_path, ast_info),
+        "metadata": {
+            "type": "file_summary",
+            "file_path": file_path,
+            "language": ast_info.language,
+        },
+    }]
+    
+    append = documents.append
+    
+    # Add function-level details
+    for func in ast_info.functions:
+        append({
+            "content": function_to_document(file_path, func),
+            "metadata": {
+                "type": "function",
+                "file_path": file_path,
+                "function_name": func.name,
+                "line_start": func.line_start,
+                "line_end": func.line_end,
+            },
+        })
+    
+    # Add class-level details
+    for cls in ast_info.classes:
+        append({
+            "content": class_to_document(file_path, cls),
+            "metadata": {
+                "type": "class",
+                "file_path": file_path,
+                "class_name": cls.name,
+                "line_start": cls.line_start,
+                "line_end": cls.line_end,
+            },
+        })
+    
+    return documents